@@ -1,8 +1,5 @@
 import sys
 import os
-from PyQt5 import QtGui, QtWidgets
-
-from graph.gui.ui_main_window import UI_MainWindow
 
 # Function to load and apply the stylesheet from a file
 def loadStylesheet(path):
@@ -22,6 +19,8 @@ def loadStylesheet(path):
     return stylesheet
 
 def loadIcon(path):
+    from PyQt5 import QtGui
+
      # Determine if the application is running as a script or as a bundled executable
     if getattr(sys, 'frozen', False):  # Check if we're in a PyInstaller bundle
         base_path = sys._MEIPASS  # Temporary folder used by PyInstaller
@@ -34,7 +33,18 @@ def loadIcon(path):
     return QtGui.QIcon(file_path)
 
 
-if __name__ == "__main__":
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Batch commands run headless, Qt is only imported for the window
+    from graph.cli import COMMANDS
+    if argv and argv[0] in COMMANDS:
+        from graph.cli import main as runCommand
+        return runCommand(argv)
+
+    from PyQt5 import QtWidgets
+    from graph.gui.ui_main_window import UI_MainWindow
+
     app = QtWidgets.QApplication([])
     main_window = QtWidgets.QMainWindow()
     main_window.resize(1420, 820)
@@ -45,4 +55,8 @@ if __name__ == "__main__":
     ui = UI_MainWindow(main_window)
     main_window.show()
 
-    app.exec_()
\ No newline at end of file
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING
+
+from .djisktra import shortestPaths
+from .paths import SingleSourcePaths
+from ..model.adjacency import SparseAdjacency
+
+if TYPE_CHECKING:
+    from ..model.vertex import Vertex
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the results are then kept as arrays
+    np = None
+
+class DjisktraBatch:
+    # Runs Dijkstra from many start vertices at once. The sources are split
+    # across a process pool. Workers read the CSR adjacency from shared
+    # memory and write their rows of the distance and predecessor blocks
+    # straight back into shared memory.
+    def __init__(self, vertices: list[Vertex], vertexIndex: dict[int, int]) -> None:
+        self.vertices = vertices
+        self.vertexIndex = vertexIndex  # Position in vertices by vertex id
+        self.startVertices = []
+        self.distances = []     # Sources x vertices block, math.inf when unreachable
+        self.predecessors = []  # Sources x vertices block, -1 when there is no predecessor
+
+    def findPaths(self, starts: list[Vertex], adjacency: SparseAdjacency, workers: int | None = None):
+        self.startVertices = list(starts)
+        sources = [self.vertexIndex[start.id] for start in starts]
+        self.distances, self.predecessors = solveSources(adjacency, sources, workers)
+        return self.distances
+
+    def getPaths(self, row: int):
+        # Lazy paths of one start vertex, keyed by goal index like Djisktra.paths
+        return SingleSourcePaths(self.predecessors[row], self.vertexIndex[self.startVertices[row].id])
+
+    def reset(self):
+        self.startVertices = []
+        self.distances = []
+        self.predecessors = []
+
+
+def solveSources(adjacency: SparseAdjacency, sources: list[int], workers: int | None = None):
+    # Returns the (sources x vertices) distance and predecessor blocks, as
+    # NumPy arrays when NumPy is available, otherwise as lists of arrays
+    n = len(adjacency)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(sources)))
+
+    blocks = []
+    try:
+        # Inputs and outputs live in shared memory so nothing is pickled per row
+        inputs = [_share(buffer, blocks) for buffer in (adjacency.indptr, adjacency.indices, adjacency.weights)]
+        distances = _allocate("d", len(sources) * n, blocks)
+        predecessors = _allocate("i", len(sources) * n, blocks)
+        outputs = [(distances.name, "d"), (predecessors.name, "i")]
+
+        size = _chunkSize(len(sources), workers)
+        chunks = [(begin, sources[begin:begin + size]) for begin in range(0, len(sources), size)]
+
+        if workers <= 1:
+            for begin, chunk in chunks:
+                _solveChunk(inputs, outputs, n, begin, chunk)
+        else:
+            # Spawned workers don't inherit the Qt threads of the parent process
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                futures = [executor.submit(_solveChunk, inputs, outputs, n, begin, chunk) for begin, chunk in chunks]
+                for future in futures:
+                    future.result()     # Re-raise worker errors
+
+        return _collect(distances, "d", len(sources), n), _collect(predecessors, "i", len(sources), n)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _chunkSize(count: int, workers: int):
+    # A few chunks per worker balances uneven sources
+    return max(1, math.ceil(count / (workers * 4)))
+
+
+def _share(buffer: array, blocks: list):
+    block = _allocate(buffer.typecode, len(buffer), blocks)
+    block.buf[:len(buffer) * buffer.itemsize] = buffer.tobytes()
+    return block.name, buffer.typecode
+
+
+def _allocate(typecode: str, length: int, blocks: list):
+    # Shared memory can't be empty, keep at least one item so the block casts
+    block = SharedMemory(create=True, size=max(1, length) * array(typecode).itemsize)
+    blocks.append(block)
+    return block
+
+
+def _collect(block: SharedMemory, typecode: str, rows: int, columns: int):
+    length = rows * columns
+    if np is not None:
+        dtype = np.float64 if typecode == "d" else np.int32
+        return np.frombuffer(block.buf, dtype=dtype, count=length).reshape(rows, columns).copy()
+
+    values = array(typecode)
+    values.frombytes(bytes(block.buf[:length * values.itemsize]))
+    return [values[row * columns:(row + 1) * columns] for row in range(rows)]
+
+
+def _solveChunk(inputs, outputs, n: int, begin: int, sources: list[int]):
+    # Runs in a worker process. Spawned workers share the parent's resource
+    # tracker, so attaching doesn't take over the blocks the parent unlinks.
+    blocks, views = [], []
+    try:
+        for name, typecode in inputs + outputs:
+            block = SharedMemory(name=name)
+            blocks.append(block)
+            views.append(block.buf.cast(typecode))
+        indptr, indices, weights, distances, predecessors = views
+
+        for offset, source in enumerate(sources):
+            d, previous = shortestPaths(indptr, indices, weights, source, n)
+            row = (begin + offset) * n
+            distances[row:row + n] = array("d", d)
+            predecessors[row:row + n] = array("i", (-1 if p is None else p for p in previous))
+    finally:
+        # Views must be released before the blocks can close
+        for view in views:
+            view.release()
+        for block in blocks:
+            block.close()
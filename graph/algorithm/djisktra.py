@@ -1,86 +1,74 @@
+from __future__ import annotations
+
+import heapq
 import math
+from typing import TYPE_CHECKING, Callable
 
-class Djisktra():
+from .paths import SingleSourcePaths
+from ..model.adjacency import SparseAdjacency
+
+if TYPE_CHECKING:
     from ..model.vertex import Vertex
 
-    def __init__(self, vertices:list[Vertex]) -> None:
-        from ..model.vertex import Vertex
+def shortestPaths(indptr, indices, weights, startIndex: int, n: int, progress: Callable[[int, int], None] | None = None):
+    # Heap-based Dijkstra over the rows of a CSR adjacency. The rows can be
+    # any indexable buffers, so worker processes can pass shared memory.
+    processed = [False] * n  # Processed vertices
+    d = [math.inf] * n  # Distance array, initialize to infinity
+    d[startIndex] = 0  # Distance to the start vertex is 0
+    predecessors = [None] * n  # Track predecessors to reconstruct paths
+
+    # Priority queue of (distance, vertex index), ties resolve to the lower index
+    heap = [(0, startIndex)]
+    processedCount = 0
+
+    while heap:
+        # Pop w in V - S such that D[w] is minimum
+        distance, w = heapq.heappop(heap)
+
+        if processed[w]:
+            continue  # Stale entry, w was already reached with a shorter distance
+
+        processed[w] = True  # Add w to S
+
+        # Report every few thousand vertices, the callback may stop the solve
+        processedCount += 1
+        if progress is not None and processedCount % 4096 == 0:
+            progress(processedCount, n)
+
+        # For each neighbor v of w, update D[v]
+        for position in range(indptr[w], indptr[w + 1]):
+            v = indices[position]
+            new_dist = distance + weights[position]
+            if new_dist < d[v]:
+                d[v] = new_dist
+                predecessors[v] = w  # Update predecessor of v
+                heapq.heappush(heap, (new_dist, v))
+
+    return d, predecessors
+
+class Djisktra():
+    def __init__(self, vertices:list[Vertex], vertexIndex: dict[int, int]) -> None:
         self.paths = {}
         self.distances = []
         self.startVertex: Vertex = None
         self.vertices = vertices
+        self.vertexIndex = vertexIndex  # Position in vertices by vertex id
 
 
-    def findPath(self, start: Vertex, adjacencyMatrix: list[list[float]]):
+    def findPath(self, start: Vertex, adjacency: SparseAdjacency, progress: Callable[[int, int], None] | None = None):
         self.startVertex = start
-        startIndex = self.vertices.index(start)
-        n = len(self.vertices)
-        s = set()  # Processed vertices
-        d = [math.inf] * n  # Distance array, initialize to infinity
-        d[startIndex] = 0  # Distance to the start vertex is 0
-        predecessors = [None] * n  # Track predecessors to reconstruct paths
-
-        # Step 2: Initialize D array with distances from start
-        for i in range(n):
-            d[i] = adjacencyMatrix[startIndex][i] if i != startIndex else 0
-            if adjacencyMatrix[startIndex][i] < math.inf:
-                predecessors[i] = startIndex  # Direct connection to start
-
-        s.add(startIndex)  # Step 7: Add start vertex to S
-
-        # Repeat for all vertices
-        for _ in range(n - 1):
-            # Step 8: Find w in V - S such that D[w] is minimum
-            w = self._minDistanceVertex(d, s)
-
-            if w is None:
-                break  # No more vertices to process
-
-            s.add(w)  # Step 7: Add w to S
-
-            # Step 9: For each v in V - S, update D[v]
-            for v in range(n):
-                if v not in s:
-                    new_dist = d[w] + adjacencyMatrix[w][v]
-                    if new_dist < d[v]:
-                        d[v] = new_dist
-                        predecessors[v] = w  # Update predecessor of v
-
-        # Build paths from predecessors array
-        self.paths = self._buildPath(predecessors, startIndex)
+        startIndex = self.vertexIndex[start.id]
+        d, predecessors = shortestPaths(
+            adjacency.indptr, adjacency.indices, adjacency.weights, startIndex, len(self.vertices), progress
+        )
+
+        # Paths are rebuilt from the predecessors array when looked up
+        self.paths = SingleSourcePaths(predecessors, startIndex)
         self.distances = d
         return self.paths
 
-    def _minDistanceVertex(self, D, S):
-        min_distance = math.inf
-        min_vertex = None
-        for i in range(len(D)):
-            if i not in S and D[i] < min_distance:
-                min_distance = D[i]
-                min_vertex = i
-        return min_vertex
-
-    def _buildPath(self, predecessors: list[int], startIndex: int):
-        paths = {}
-        for v in range(len(predecessors)):
-            path = []
-            current = v
-            visited = set()  # To track visited nodes
-
-            # Backtrack from v to start_id using predecessors
-            while current is not None:
-                # Check for circular reference
-                if current in visited:
-                    break
-                visited.add(current)
-
-                path.insert(0, current)
-                current = predecessors[current]
-
-            if path and path[0] == startIndex:  # Only add the path if it starts at the source
-                paths[v] = path
-        return paths
-    
     def reset(self):
-        self.paths.clear()
-        self.distances.clear()
\ No newline at end of file
+        # Drop the references only, the results may still be in the graph's cache
+        self.paths = {}
+        self.distances = []
\ No newline at end of file
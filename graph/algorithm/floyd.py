@@ -1,14 +1,183 @@
+from __future__ import annotations
+
+import heapq
 import math
+from typing import TYPE_CHECKING, Callable
 
-class FloydWarshall:
+from .paths import AllPairsPaths
+from ..model.adjacency import SparseAdjacency
+
+if TYPE_CHECKING:
     from ..model.vertex import Vertex
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the pure Python loops are used without it
+    np = None
+
+class FloydWarshall:
+    isVectorized = np is not None   # Relaxes whole rows with NumPy
+
     def __init__(self, vertices: list[Vertex]) -> None:
         self.paths = {}
         self.distances = []
+        self.predecessors = []
         self.vertices = vertices
+        self._matrix = None     # NumPy copy of the distances, made for incremental updates
+
+    def findPath(self, adjacency: SparseAdjacency, progress: Callable[[int, int], None] | None = None):
+        if np is not None:
+            d, predecessors = self._solveNumpy(adjacency, progress)
+        else:
+            d, predecessors = self._solve(adjacency.toDense(), progress)
+
+        # Step 3: Paths are rebuilt from the predecessor matrix when looked up
+        self.setResults(d, predecessors)
+        return self.paths
+
+    def setResults(self, distances, predecessors):
+        # Also takes the results of another all pairs engine, like Johnson
+        self.distances = distances
+        self.predecessors = predecessors
+        self.paths = AllPairsPaths(predecessors)
+        self._matrix = None
+
+    def updateEdge(self, start: int, end: int, oldWeight: float, newWeight: float, adjacency: SparseAdjacency):
+        # Update the results after a single edge change instead of solving
+        # again. Returns False when only a full solve can bring them up to
+        # date, the adjacency already has to include the change.
+        n = len(self.distances)
+        if n != len(adjacency) or not 0 <= start < n or not 0 <= end < n:
+            return False
+        if any(weight < 0 for weight in adjacency.weights):
+            return False    # The row repairs below run Dijkstra
+
+        if newWeight <= oldWeight:
+            self._decreaseEdge(start, end, newWeight)
+        else:
+            self._increaseEdge(start, end, adjacency)
+
+        # The paths cache routes, so they start over from the new predecessors
+        self.paths = AllPairsPaths(self.predecessors)
+        return True
+
+    def _decreaseEdge(self, start: int, end: int, weight: float):
+        # An added edge or a lower weight can only shorten the pairs whose
+        # new path runs through it, which is a single O(V^2) relaxation
+        if weight == math.inf:
+            return
+        d = self.distances
+
+        if np is not None:
+            matrix, predecessors = self._getMatrix(), self._getPredecessorMatrix()
+            through = matrix[:, start, None] + weight + matrix[None, end, :]
+            improved = matrix > through
+            predecessorRow = predecessors[end].copy()
+            predecessorRow[end] = start
+            np.copyto(matrix, through, where=improved)
+            np.copyto(predecessors, np.broadcast_to(predecessorRow, matrix.shape), where=improved)
+
+            # Only the improved pairs are copied back to the nested lists
+            for i, j in zip(*np.nonzero(improved)):
+                d[i][j] = d[i][start] + weight + d[end][j]
+            return
+
+        n, predecessors = len(d), self.predecessors
+        for i in range(n):
+            through_start = d[i][start] + weight
+            if through_start == math.inf:
+                continue
+            row = d[i]
+            for j in range(n):
+                if row[j] > through_start + d[end][j]:
+                    row[j] = through_start + d[end][j]
+                    predecessors[i][j] = start if j == end else predecessors[end][j]
+
+    def _increaseEdge(self, start: int, end: int, adjacency: SparseAdjacency):
+        # A removed edge or a higher weight only affects the pairs whose
+        # shortest path runs through it. For each start that is the subtree
+        # below the edge in its shortest path tree, only those are repaired.
+        n, predecessors = len(self.distances), self.predecessors
+        if np is not None:
+            predecessors = self._getPredecessorMatrix()
+            rows = np.nonzero(predecessors[:, end] == start)[0].tolist()
+        else:
+            rows = [i for i in range(n) if predecessors[i][end] == start]
+        if not rows:
+            return
+
+        incoming = [[] for _ in range(n)]
+        for u in range(n):
+            for position in range(adjacency.indptr[u], adjacency.indptr[u + 1]):
+                incoming[adjacency.indices[position]].append((u, adjacency.weights[position]))
+
+        for i in rows:
+            self._repairRow(i, end, adjacency, incoming)
+
+    def _repairRow(self, i: int, end: int, adjacency: SparseAdjacency, incoming: list[list[tuple[int, float]]]):
+        d = self.distances[i]
+        predecessors = self.predecessors[i]
+        row = predecessors.tolist() if np is not None else predecessors
+
+        # Step 1: Collect the subtree below the changed edge
+        children = {}
+        for j, predecessor in enumerate(row):
+            if predecessor is not None and predecessor >= 0:
+                children.setdefault(predecessor, []).append(j)
+        subtree = {end}
+        stack = [end]
+        while stack:
+            for child in children.get(stack.pop(), ()):
+                if child not in subtree:
+                    subtree.add(child)
+                    stack.append(child)
+
+        # Step 2: Seed the subtree from its best edge coming from outside of it,
+        # the distances outside of the subtree are still the shortest ones
+        heap = []
+        for v in subtree:
+            d[v] = math.inf
+            row[v] = None
+            for u, weight in incoming[v]:
+                if u not in subtree and d[u] + weight < d[v]:
+                    d[v] = d[u] + weight
+                    row[v] = u
+            if d[v] != math.inf:
+                heapq.heappush(heap, (d[v], v))
+
+        # Step 3: Dijkstra limited to the subtree
+        processed = set()
+        while heap:
+            distance, w = heapq.heappop(heap)
+            if w in processed:
+                continue
+            processed.add(w)
+            for position in range(adjacency.indptr[w], adjacency.indptr[w + 1]):
+                v = adjacency.indices[position]
+                if v in subtree and distance + adjacency.weights[position] < d[v]:
+                    d[v] = distance + adjacency.weights[position]
+                    row[v] = w
+                    heapq.heappush(heap, (d[v], v))
+
+        if np is not None:
+            columns = list(subtree)
+            self._getMatrix()[i, columns] = [d[v] for v in columns]
+            predecessors[columns] = [-1 if row[v] is None else row[v] for v in columns]
 
-    def findPath(self, adjacencyMatrix: list[list[float]]):
+    def _getMatrix(self):
+        if self._matrix is None:
+            self._matrix = np.array(self.distances, dtype=np.float64).reshape(len(self.distances), -1)
+        return self._matrix
+
+    def _getPredecessorMatrix(self):
+        # Results of the pure Python loops or Johnson use nested lists with None
+        if not hasattr(self.predecessors, "ndim"):
+            self.predecessors = np.array(
+                [[-1 if p is None else p for p in row] for row in self.predecessors], dtype=np.int32
+            ).reshape(len(self.distances), len(self.distances))
+        return self.predecessors
+
+    def _solve(self, adjacencyMatrix: list[list[float]], progress=None):
         n = len(self.vertices)
         # Initialize the distance and predecessor matrices
         d = [[math.inf] * n for _ in range(n)]
@@ -25,45 +194,59 @@ class FloydWarshall:
 
         # Step 2: Floyd-Warshall algorithm
         for k in range(n):
+            self._reportProgress(progress, k, n)
             for i in range(n):
                 for j in range(n):
                     if d[i][j] > d[i][k] + d[k][j]:
                         d[i][j] = d[i][k] + d[k][j]
                         predecessors[i][j] = predecessors[k][j]
 
-        # Step 3: Build paths from predecessor matrix
-        self.paths = self._buildPaths(predecessors)
-        self.distances = d
-        return self.paths
+        return d, predecessors
 
-    def _buildPaths(self, predecessors: list[list[int]]):
-        paths = {}
+    def _solveNumpy(self, adjacency: SparseAdjacency, progress=None):
         n = len(self.vertices)
+        if n == 0:
+            return [], []
 
-        for i in range(n):
-            for j in range(n):
-                if i != j and predecessors[i][j] is not None:
-                    path = []
-                    current = j
-                    visited = set()  # Track visited nodes to prevent infinite loops
+        # Step 1: Initialize contiguous distance and predecessor matrices
+        # straight from the sparse rows, -1 stands for a missing predecessor
+        isIntegral = adjacency.weights.typecode == "q"
+        indptr = np.frombuffer(adjacency.indptr, dtype=np.int64)
+        rows = np.repeat(np.arange(n), np.diff(indptr))
+        columns = np.frombuffer(adjacency.indices, dtype=np.int32)
+        d = np.full((n, n), np.inf)
+        d[rows, columns] = np.frombuffer(adjacency.weights, dtype=np.int64 if isIntegral else np.float64)
+        np.fill_diagonal(d, 0)
+        predecessors = np.where(np.isfinite(d), np.arange(n, dtype=np.int32)[:, None], -1).astype(np.int32)
+        np.fill_diagonal(predecessors, -1)
 
-                    # Backtrack from j to i using predecessors
-                    while current is not None and current != i:
-                        # Check if we've already visited this vertex to avoid circular paths
-                        if current in visited:
-                            break 
-                        visited.add(current)
-
-                        # Insert the current vertex to the path
-                        path.insert(0, current)  
-                        current = predecessors[i][current]
+        # Step 2: Relax every pair through k at once. Row k and column k can't
+        # improve during pass k, so the in-place update matches the triple loop.
+        for k in range(n):
+            self._reportProgress(progress, k, n)
+            through_k = d[:, k, None] + d[None, k, :]
+            improved = d > through_k
+            np.copyto(d, through_k, where=improved)
+            np.copyto(predecessors, np.broadcast_to(predecessors[k], (n, n)), where=improved)
 
-                    if current == i:
-                        path.insert(0, i)  # Insert the start node at the beginning
-                        paths[(i, j)] = path  # Store the path from i to j
+        # Convert the distances back to nested lists, keeping integer weights
+        # as integers so the results are identical to the pure Python loops
+        distances = d.tolist()
+        for i, row in enumerate(distances):
+            if isIntegral:
+                row[:] = [int(value) if value != math.inf else value for value in row]
+            row[i] = 0
+        return distances, predecessors
 
-        return paths
+    @staticmethod
+    def _reportProgress(progress, k: int, n: int):
+        # Roughly a hundred reports per solve, the callback may stop the solve
+        if progress is not None and k % max(1, n // 100) == 0:
+            progress(k, n)
 
     def reset(self):
-        self.paths.clear()
-        self.distances.clear()
+        # Rebind instead of clearing, a cached solve can share these lists
+        self.paths = {}
+        self.distances = []
+        self.predecessors = []
+        self._matrix = None
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import math
+from array import array
+from typing import TYPE_CHECKING, Callable
+
+from .djisktra import shortestPaths
+from .paths import AllPairsPaths
+from ..model.adjacency import SparseAdjacency
+
+if TYPE_CHECKING:
+    from ..model.vertex import Vertex
+
+class Johnson:
+    # All pairs shortest paths as one heap-based Dijkstra per vertex, which
+    # beats Floyd-Warshall on sparse graphs. The weights are reweighted with
+    # Bellman-Ford potentials first so negative weights also work.
+    def __init__(self, vertices: list[Vertex]) -> None:
+        self.paths = {}
+        self.distances = []
+        self.predecessors = []
+        self.vertices = vertices
+
+    def findPath(self, adjacency: SparseAdjacency, progress: Callable[[int, int], None] | None = None):
+        d = []
+        predecessors = []
+        for _, row, previous in self.iterRows(adjacency, progress):
+            d.append(row)
+            predecessors.append(previous)
+
+        # Paths are rebuilt from the predecessor matrix when looked up
+        self.paths = AllPairsPaths(predecessors)
+        self.distances = d
+        self.predecessors = predecessors
+        return self.paths
+
+    def iterRows(self, adjacency: SparseAdjacency, progress: Callable[[int, int], None] | None = None):
+        # Yields (start index, distances, predecessors) one start at a time,
+        # so callers can stream the rows without keeping the whole matrix
+        n = len(self.vertices)
+
+        # Step 1: Potentials that make every edge weight non-negative
+        potentials = self._potentials(adjacency)
+        weights = self._reweight(adjacency, potentials)
+
+        # Step 2: Dijkstra from every vertex over the reweighted edges
+        for start in range(n):
+            if progress is not None and start % max(1, n // 100) == 0:
+                progress(start, n)  # The callback may stop the solve
+            row, previous = shortestPaths(adjacency.indptr, adjacency.indices, weights, start, n)
+
+            # Undo the reweighting, paths keep their order so only the ends matter
+            if potentials is not None:
+                row = [
+                    distance - potentials[start] + potentials[goal] if distance != math.inf else distance
+                    for goal, distance in enumerate(row)
+                ]
+            yield start, row, previous
+
+    def _potentials(self, adjacency: SparseAdjacency):
+        # Bellman-Ford from a virtual vertex joined to every vertex with a zero
+        # weight edge. Returns None when every weight is already non-negative.
+        if all(weight >= 0 for weight in adjacency.weights):
+            return None
+
+        n = len(adjacency)
+        h = [0] * n
+        for _ in range(n):
+            changed = False
+            for u in range(n):
+                for position in range(adjacency.indptr[u], adjacency.indptr[u + 1]):
+                    v = adjacency.indices[position]
+                    if h[u] + adjacency.weights[position] < h[v]:
+                        h[v] = h[u] + adjacency.weights[position]
+                        changed = True
+            if not changed:
+                return h
+
+        # Still relaxing after n passes, some cycle keeps getting shorter
+        raise ValueError("The graph has a negative weight cycle.")
+
+    @staticmethod
+    def _reweight(adjacency: SparseAdjacency, potentials: list[float] | None):
+        if potentials is None:
+            return adjacency.weights
+
+        weights = array(adjacency.weights.typecode, adjacency.weights)
+        for u in range(len(adjacency)):
+            for position in range(adjacency.indptr[u], adjacency.indptr[u + 1]):
+                weights[position] += potentials[u] - potentials[adjacency.indices[position]]
+        return weights
+
+    def reset(self):
+        self.paths = {}
+        self.distances = []
+        self.predecessors = []
@@ -0,0 +1,128 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Mapping
+
+class PathMap(Mapping, ABC):
+    # Read-only mapping of shortest paths that only rebuilds a route from the
+    # predecessor array when it is looked up. Recently used routes are kept
+    # in a bounded LRU cache.
+
+    def __init__(self, predecessors, cacheSize: int = 128) -> None:
+        self._predecessors = predecessors
+        self._cache: OrderedDict = OrderedDict()
+        self._cacheSize = cacheSize
+        self._length: int | None = None
+
+    def __getitem__(self, key):
+        path = self._cache.get(key)
+        if path is None:
+            start, goal, row = self._route(key)
+            path = self._trace(row, start, goal)
+            if path is None:
+                raise KeyError(key)
+
+            self._cache[key] = path
+            if len(self._cache) > self._cacheSize:
+                self._cache.popitem(last=False)  # Evict the least recently used route
+        else:
+            self._cache.move_to_end(key)
+        return list(path)  # Copy so callers can't change the cached route
+
+    def __contains__(self, key):
+        try:
+            start, goal, row = self._route(key)
+        except KeyError:
+            return False
+        return start == goal or not self._isMissing(row[goal])
+
+    def __len__(self):
+        if self._length is None:
+            self._length = self._count()
+        return self._length
+
+    def clear(self):
+        self._predecessors = []
+        self._cache.clear()
+        self._length = 0
+
+    @abstractmethod
+    def _route(self, key):
+        # Returns the start index, goal index and the predecessor row to follow
+        ...
+
+    @abstractmethod
+    def _count(self):
+        # Number of reachable routes
+        ...
+
+    def _trace(self, row, start: int, goal: int):
+        # Backtrack from goal to start, appending and reversing once at the end
+        path = [goal]
+        current = goal
+        while current != start:
+            current = row[current]
+            # Stop on unreachable goals and guard against circular references
+            if self._isMissing(current) or len(path) > len(row):
+                return None
+            current = int(current)
+            path.append(current)
+        path.reverse()
+        return tuple(path)
+
+    @staticmethod
+    def _isMissing(predecessor):
+        return predecessor is None or predecessor < 0
+
+
+class SingleSourcePaths(PathMap):
+    # Paths from one start vertex, keyed by the goal index
+
+    def __init__(self, predecessors: list[int | None], startIndex: int, cacheSize: int = 128) -> None:
+        super().__init__(predecessors, cacheSize)
+        self.startIndex = startIndex
+
+    def __iter__(self):
+        for goal, predecessor in enumerate(self._predecessors):
+            if goal == self.startIndex or not self._isMissing(predecessor):
+                yield goal
+
+    def _route(self, goal):
+        if not isinstance(goal, int) or not 0 <= goal < len(self._predecessors):
+            raise KeyError(goal)
+        return self.startIndex, goal, self._predecessors
+
+    def _count(self):
+        if not self._predecessors:
+            return 0
+        reached = sum(1 for predecessor in self._predecessors if not self._isMissing(predecessor))
+        return reached + 1  # The start vertex always has a path to itself
+
+
+class AllPairsPaths(PathMap):
+    # Paths between every pair of distinct vertices, keyed by (start, goal)
+    # indices. The predecessor matrix may be nested lists or a NumPy array
+    # that uses -1 for missing predecessors.
+
+    def __iter__(self):
+        for start, row in enumerate(self._predecessors):
+            for goal, predecessor in enumerate(row):
+                if start != goal and not self._isMissing(predecessor):
+                    yield (start, goal)
+
+    def _route(self, key):
+        try:
+            start, goal = key
+        except (TypeError, ValueError):
+            raise KeyError(key)
+
+        n = len(self._predecessors)
+        if start == goal or not (0 <= start < n and 0 <= goal < n):
+            raise KeyError(key)
+        return start, goal, self._predecessors[start]
+
+    def _count(self):
+        if hasattr(self._predecessors, "ndim"):  # NumPy predecessor matrix
+            return int((self._predecessors >= 0).sum())
+        return sum(
+            1 for row in self._predecessors for predecessor in row if not self._isMissing(predecessor)
+        )
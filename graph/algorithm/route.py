@@ -0,0 +1,110 @@
+import heapq
+import math
+from typing import Callable
+
+from ..model.adjacency import SparseAdjacency
+
+class Route:
+    # Shortest path between a single start and goal. Both searches stop as
+    # soon as the route is known, so they usually explore a small part of
+    # the graph instead of solving from the start to every vertex.
+
+    def __init__(self) -> None:
+        self.path: list[int] = []   # Vertex indices from start to goal, empty when unreachable
+        self.distance = math.inf
+        self.explored = 0   # Vertices settled by the last search
+
+    def findBidirectional(self, start: int, goal: int, adjacency: SparseAdjacency, reverse: SparseAdjacency):
+        # Dijkstra from the start over the edges and from the goal over the
+        # reversed edges, always growing the frontier with the smaller key.
+        # Stops once the two frontiers can't improve the best meeting point.
+        if start == goal:
+            return self._setResult([start], 0, 1)
+
+        sides = [
+            (adjacency, {start: 0}, {start: None}, [(0, start)], set()),     # Forward
+            (reverse, {goal: 0}, {goal: None}, [(0, goal)], set()),         # Backward
+        ]
+        best, meeting = math.inf, None
+
+        while sides[0][3] and sides[1][3]:
+            if sides[0][3][0][0] + sides[1][3][0][0] >= best:
+                break  # Neither frontier can lead to a shorter route
+
+            side = 0 if sides[0][3][0][0] <= sides[1][3][0][0] else 1
+            edges, d, previous, heap, settled = sides[side]
+            _, otherD, _, _, _ = sides[1 - side]
+
+            distance, w = heapq.heappop(heap)
+            if w in settled:
+                continue
+            settled.add(w)
+
+            for position in range(edges.indptr[w], edges.indptr[w + 1]):
+                v = edges.indices[position]
+                new_dist = distance + edges.weights[position]
+                if new_dist < d.get(v, math.inf):
+                    d[v] = new_dist
+                    previous[v] = w
+                    heapq.heappush(heap, (new_dist, v))
+
+                # An edge into the other search's reach joins the two halves
+                if v in otherD and new_dist + otherD[v] < best:
+                    best, meeting = new_dist + otherD[v], v
+
+        explored = len(sides[0][4]) + len(sides[1][4])
+        if meeting is None:
+            return self._setResult([], math.inf, explored)
+
+        # Walk back to the start, then forward along the backward search to the goal
+        path = self._trace(sides[0][2], meeting)
+        path.reverse()
+        path += self._trace(sides[1][2], meeting)[1:]
+        return self._setResult(path, best, explored)
+
+    def findAStar(self, start: int, goal: int, adjacency: SparseAdjacency, heuristic: Callable[[int], float]):
+        # Dijkstra ordered by distance plus an estimate of the rest of the way.
+        # The heuristic has to be consistent, it never overestimates an edge.
+        d = {start: 0}
+        previous = {start: None}
+        heap = [(heuristic(start), start)]
+        settled = set()
+
+        while heap:
+            _, w = heapq.heappop(heap)
+            if w in settled:
+                continue
+            settled.add(w)
+            if w == goal:
+                path = self._trace(previous, goal)
+                path.reverse()
+                return self._setResult(path, d[goal], len(settled))
+
+            for position in range(adjacency.indptr[w], adjacency.indptr[w + 1]):
+                v = adjacency.indices[position]
+                new_dist = d[w] + adjacency.weights[position]
+                if new_dist < d.get(v, math.inf):
+                    d[v] = new_dist
+                    previous[v] = w
+                    heapq.heappush(heap, (new_dist + heuristic(v), v))
+
+        return self._setResult([], math.inf, len(settled))
+
+    @staticmethod
+    def _trace(previous: dict[int, int | None], vertex: int):
+        # Vertices from the given one back to where its search began
+        path = [vertex]
+        while previous[path[-1]] is not None:
+            path.append(previous[path[-1]])
+        return path
+
+    def _setResult(self, path: list[int], distance: float, explored: int):
+        self.path = path
+        self.distance = distance
+        self.explored = explored
+        return path
+
+    def reset(self):
+        self.path = []
+        self.distance = math.inf
+        self.explored = 0
@@ -0,0 +1,131 @@
+import argparse
+import math
+import sys
+import time
+from array import array
+
+from graph.model import importer, storage
+from graph.algorithm.johnson import Johnson
+
+try:
+    import resource
+except ImportError:  # Not available on Windows, the peak RSS is then not reported
+    resource = None
+
+COMMANDS = ("solve",)
+ALGORITHMS = ("djisktra", "floyd", "johnson", "auto")
+
+def main(argv: list[str] | None = None):
+    # Headless entry point, nothing here imports Qt
+    parser = argparse.ArgumentParser(prog="python -m graph", description="Shortest path batch jobs without a display.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solve = commands.add_parser("solve", help="Load a graph file, solve it and write the distances.")
+    solve.add_argument("--algo", choices=ALGORITHMS, default="auto",
+                       help="djisktra solves from --start, the others solve all pairs (default: auto)")
+    solve.add_argument("--input", required=True, help="A .graph, .json, .csv or .graphml file, or else an edge list of 'start end [weight]' lines")
+    solve.add_argument("--output", required=True, help="Distances as .npy, or as CSV for any other extension")
+    solve.add_argument("--start", type=int, help="Start vertex id for djisktra (default: the first vertex)")
+    solve.add_argument("--sources", type=parseIds,
+                       help="Comma separated start vertex ids for djisktra, solved together across worker processes")
+    solve.add_argument("--workers", type=int, help="Worker processes for --sources (default: one per CPU)")
+    solve.add_argument("--stream", action="store_true",
+                       help="Solve the all pairs rows one by one with johnson and write each as it is done")
+    solve.add_argument("--quiet", action="store_true", help="Don't report the wall time and peak RSS")
+
+    args = parser.parse_args(argv)
+    if args.stream and args.algo == "floyd":
+        # Floyd-Warshall needs the whole matrix at once, which streaming avoids
+        solve.error("--stream solves the rows one by one with johnson, it can't be used with --algo floyd")
+    if args.sources is not None and args.algo != "djisktra":
+        solve.error("--sources gives the start vertices of --algo djisktra")
+    if args.sources is not None and args.start is not None:
+        solve.error("--start and --sources can't be used together")
+
+    began = time.perf_counter()
+    try:
+        runSolve(args)
+    except (OSError, KeyError, ValueError, SyntaxError) as e:   # Malformed XML raises a SyntaxError
+        parser.exit(1, f"error: {e}\n")
+
+    if not args.quiet:
+        report(time.perf_counter() - began)
+    return 0
+
+def runSolve(args: argparse.Namespace):
+    if args.input.endswith((storage.BINARY_SUFFIX, storage.JSON_SUFFIX)):
+        graph = storage.load(args.input)
+    else:
+        graph = importer.load(args.input)
+    ids = [vertex.id for vertex in graph.vertices]
+
+    if args.algo == "djisktra" and args.sources is not None:
+        # One row per source, in the order they were given
+        missing = [start for start in args.sources if start not in graph.vertexById]
+        if missing:
+            raise KeyError(f"Start vertices {missing} are not in the graph.")
+        batch = graph.batchShortestPaths(args.sources, args.workers)
+        rows = [(graph.vertexIndex[start], row) for start, row in zip(args.sources, batch.distances)]
+    elif args.algo == "djisktra":
+        start = args.start if args.start is not None else ids[0] if ids else None
+        if start not in graph.vertexById:
+            raise KeyError(f"Start vertex {start} is not in the graph.")
+        djisktra = graph.shortestPaths(start)
+        rows = [(graph.vertexIndex[start], djisktra.distances)]
+    else:
+        algorithm = args.algo
+        if algorithm == "auto":
+            # Streaming only bounds the memory when the rows are solved one by one
+            algorithm = "johnson" if args.stream else graph.chooseAllPairs()
+        if args.stream:
+            # One Dijkstra per row, only the row being written is kept
+            rows = ((start, row) for start, row, _ in Johnson(list(graph.vertices)).iterRows(graph.getAdjacency()))
+        else:
+            rows = enumerate(graph.allPairs(algorithm).distances)
+
+    shape = (len(rows) if args.algo == "djisktra" else len(ids), len(ids))
+    if args.output.endswith(".npy"):
+        writeNpy(args.output, shape, rows)
+    else:
+        writeCsv(args.output, ids, rows)
+
+def parseIds(text: str):
+    try:
+        return [int(id) for id in text.split(",") if id.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid vertex ids: {text!r}") from None
+
+def writeNpy(path: str, shape: tuple[int, int], rows):
+    # NumPy .npy file of little endian doubles, written row by row so NumPy
+    # isn't needed and the matrix never has to be held in memory
+    header = f"{{'descr': '<f8', 'fortran_order': False, 'shape': {shape}, }}"
+    padding = 64 - (10 + len(header) + 1) % 64
+    header = header + " " * padding + "\n"
+
+    with open(path, "wb") as file:
+        file.write(b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1"))
+        for _, row in rows:
+            values = array("d", row)
+            if sys.byteorder != "little":
+                values.byteswap()
+            values.tofile(file)
+
+def writeCsv(path: str, ids: list[int], rows):
+    # A header row of goal ids, then one row per start with its id first
+    with open(path, "w") as file:
+        file.write(",".join(["start"] + [str(id) for id in ids]) + "\n")
+        for start, row in rows:
+            file.write(",".join([str(ids[start])] + [formatDistance(distance) for distance in row]) + "\n")
+
+def formatDistance(distance):
+    if distance == math.inf:
+        return "inf"
+    return str(int(distance)) if float(distance).is_integer() else repr(float(distance))
+
+def report(seconds: float):
+    message = f"wall time: {seconds:.3f} s"
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak *= 1 if sys.platform == "darwin" else 1024   # Bytes on macOS, kibibytes elsewhere
+        message += f", peak RSS: {peak / 2 ** 20:.1f} MiB"
+    print(message, file=sys.stderr)
@@ -1,10 +1,12 @@
 from PyQt5 import QtCore, QtGui, QtWidgets
 from ..model.graph import Graph
+from .table_models import AdjacencyMatrixModel, PathTableModel
 
 class TopPanel(QtWidgets.QVBoxLayout):
     def __init__(self, graph: Graph):
         super().__init__()
         self.graph = graph
+        self._graphVersion = None   # Graph version the panel was last filled from
 
         self.addLayout(self.graphInfo())
         self.addWidget(self.separator("horizontal"))
@@ -12,6 +14,11 @@ class TopPanel(QtWidgets.QVBoxLayout):
         self.addWidget(self.separator("horizontal"))
         self.addLayout(self.pathTable(), stretch=1)
 
+        # Solves run in the background, the path table follows their state
+        self.graph.solveStarted.connect(self.solveCallback)
+        self.graph.solveProgress.connect(self.solveCallback)
+        self.graph.solveFinished.connect(self.update)
+
     def graphInfo(self):
         # Displays the graph order and size
         layout = QtWidgets.QGridLayout()
@@ -55,8 +62,11 @@ class TopPanel(QtWidgets.QVBoxLayout):
         layout = QtWidgets.QVBoxLayout()
 
         matrixLabel = QtWidgets.QLabel("Adjacency Matrix")
-        self.matrixTable = QtWidgets.QTableWidget()
+        self.matrixModel = AdjacencyMatrixModel(self.graph)
+        self.matrixTable = QtWidgets.QTableView()
+        self.matrixTable.setModel(self.matrixModel)
         self.matrixTable.horizontalHeader().setVisible(False) 
+        self.matrixTable.horizontalHeader().setDefaultSectionSize(1)   # Narrowest columns the header allows
         self.matrixTable.verticalHeader().setVisible(False)    
         self.matrixTable.setShowGrid(False)
 
@@ -66,38 +76,61 @@ class TopPanel(QtWidgets.QVBoxLayout):
     
     def pathTable(self):
         layout = QtWidgets.QVBoxLayout()
-        pathLabel = QtWidgets.QLabel("Path Table")
-        horizontalHeaders = ["Start", "Goal", "Distance"]
-        columns = len(horizontalHeaders)
-
-        self.pathTableWidget = QtWidgets.QTableWidget()
-        self.pathTableWidget.setColumnCount(columns)
-        self.pathTableWidget.setHorizontalHeaderLabels(horizontalHeaders)
+        self.pathLabel = QtWidgets.QLabel("Path Table")
+
+        # Filters applied by the model without building every row
+        filterLayout = QtWidgets.QHBoxLayout()
+        self.reachableCheckbox = QtWidgets.QCheckBox("Reachable only")
+        self.reachableCheckbox.stateChanged.connect(self.pathFilterCallback)
+        self.minDistanceTextbox = QtWidgets.QLineEdit()
+        self.minDistanceTextbox.setPlaceholderText("Distance >")
+        self.minDistanceTextbox.setValidator(QtGui.QDoubleValidator())
+        self.minDistanceTextbox.textChanged.connect(self.pathFilterCallback)
+        filterLayout.addWidget(self.reachableCheckbox)
+        filterLayout.addWidget(self.minDistanceTextbox)
+
+        self.pathModel = PathTableModel()
+        self.pathTableWidget = QtWidgets.QTableView()
+        self.pathTableWidget.setModel(self.pathModel)
+        self.pathTableWidget.setSortingEnabled(True)
+        self.pathTableWidget.horizontalHeader().setSortIndicator(-1, QtCore.Qt.AscendingOrder)
         self.pathTableWidget.verticalHeader().sectionClicked.connect(self.pathTableCallback)
-        self.pathTableWidget.resizeColumnsToContents()
 
-        layout.addWidget(pathLabel, alignment=QtCore.Qt.AlignCenter)
+        layout.addWidget(self.pathLabel, alignment=QtCore.Qt.AlignCenter)
+        layout.addLayout(filterLayout)
         layout.addWidget(self.pathTableWidget, stretch=1)
 
         return layout
     
     def pathTableCallback(self, rowIndex):
-        # Get the vertex id
-        startVertexId = 0
-        goalVertexId = 0
-        
-        startItem = self.pathTableWidget.item(rowIndex, 0)
-        goalItem = self.pathTableWidget.item(rowIndex, 1)
-        if startItem is not None and goalItem is not None:
-            startVertexId = int(startItem.text())
-            goalVertexId = int(goalItem.text())
-
-        startVertex = next((v for v in self.graph.vertices if v.id == startVertexId), None)
-        goalVertex = next((v for v in self.graph.vertices if v.id == goalVertexId), None)
+        # Get the vertex ids shown on the row
+        if not 0 <= rowIndex < self.pathModel.rowCount():
+            return
+        startVertexId, goalVertexId = self.pathModel.getVertexIds(rowIndex)
+
+        startVertex = self.graph.getVertex(startVertexId)
+        goalVertex = self.graph.getVertex(goalVertexId)
 
         if startVertex is not None and goalVertex is not None:
             self.graph.showPath(startVertex, goalVertex)
 
+    def solveCallback(self, done: int = 0, total: int = 0):
+        # Show that a solve is running and how far along it is
+        if not self.graph.isSolving:
+            self.pathLabel.setText("Path Table")
+        elif total:
+            self.pathLabel.setText(f"Path Table (computing {100 * done // total}%)")
+        else:
+            self.pathLabel.setText("Path Table (computing...)")
+
+    def pathFilterCallback(self):
+        text = self.minDistanceTextbox.text()
+        try:
+            minDistance = float(text) if text else None
+        except ValueError:
+            minDistance = None
+        self.pathModel.setFilter(self.reachableCheckbox.isChecked(), minDistance)
+
     def separator(self, orientation):
         separator = QtWidgets.QFrame()
         if orientation == "vertical":
@@ -112,9 +145,13 @@ class TopPanel(QtWidgets.QVBoxLayout):
     
     def update(self):
         # Update Adjacency Matrix
-        self._updateMatrix()
+        graphChanged = self.graph.version != self._graphVersion
+        if graphChanged:
+            self._graphVersion = self.graph.version
+            self._updateMatrix()
 
         # Update Path Table
+        self.solveCallback()
         try:
             if self.graph.isUsingDjisktra:
                 self._updatePathTableDjisktra()
@@ -123,19 +160,21 @@ class TopPanel(QtWidgets.QVBoxLayout):
         except Exception as e:
             print(str(e))
 
-        # Update the textboxes
-        self.orderTextbox.setText(str(len(self.graph.vertices)))
-        self.sizeTextbox.setText(str(len(self.graph.edges)))
-        self._updateVertexSet()
-        self._updateEdgeSet()
-
-        # Update Degrees
-        for vertex in self.graph.vertices:
-            vertex.update()
+        # The textboxes and degrees only change with the graph
+        if graphChanged:
+            # Update the textboxes
+            self.orderTextbox.setText(str(len(self.graph.core.vertices)))
+            self.sizeTextbox.setText(str(self.graph.core.edgeCount))
+            self._updateVertexSet()
+            self._updateEdgeSet()
+
+            # Update Degrees
+            for vertex in self.graph.vertexItems.values():
+                vertex.update()
         super().update()
 
     def _updateVertexSet(self):
-        vertices = self.graph.vertices
+        vertices = self.graph.core.vertices
         vertex_set = []
         for vertex in vertices:
             vertex_set.append(str(vertex.id))
@@ -143,93 +182,27 @@ class TopPanel(QtWidgets.QVBoxLayout):
         self.vertexSetTextbox.append("V(G) = {" + ', '.join(map(str, vertex_set)) + '}')
 
     def _updateEdgeSet(self):
-        edges = self.graph.edges
+        edges = self.graph.core.edges
         edge_set = []
-        for edge in edges:
-            vertexA_id = edge.start_vertex.id
-            vertexB_id = edge.end_vertex.id
+        for vertexA_id, vertexB_id in edges:
             edge_set.append(f"({str(vertexA_id)}, {str(vertexB_id)})")
         self.edgeSetTextbox.clear()
         self.edgeSetTextbox.append("E(G) = {" + ', '.join(map(str, edge_set)) + '}')
 
     def _updateMatrix(self):
-        self.graph.createAdjMatrix()
-        self.matrixTable.clear()
-        matrix = self.graph.adjacencyMatrix
-
-        self.matrixTable.setRowCount(len(matrix))
-        self.matrixTable.setColumnCount(len(matrix[0]) if matrix else 0)
-
-        for rowIndex, row in enumerate(matrix):
-            for columnIndex, value in enumerate(row):
-                item = QtWidgets.QTableWidgetItem(str(value))  
-                self.matrixTable.setItem(rowIndex, columnIndex, item)
-                self.matrixTable.setColumnWidth(columnIndex, 1)
+        # The model reads the cells on demand and signals only what changed
+        self.matrixModel.refresh()
             
     def _updatePathTableDjisktra(self):
-        self.pathTableWidget.setRowCount(0)
+        djisktra = self.graph.djisktra
+        startIndex = None
+        if djisktra.paths and djisktra.startVertex is not None:
+            startIndex = self.graph.indexOf(djisktra.startVertex)
 
-        paths = self.graph.djisktra.paths
-        if not paths:
-            return
-        
-        vertices = self.graph.vertices
-        startVertex = self.graph.djisktra.startVertex
-        distances = self.graph.djisktra.distances
-
-        rows = len(vertices) - 1 if vertices else 0
-        verticalHeaders = ["Show Path"] * rows
-
-        self.pathTableWidget.setRowCount(rows)
-        self.pathTableWidget.setVerticalHeaderLabels(verticalHeaders)
-        
-
-        rowIndex = 0
-        for goalVertex in vertices:
-            if startVertex != goalVertex:
-                startItem = QtWidgets.QTableWidgetItem(str(startVertex.id)) 
-                startItem.setTextAlignment(QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter)
-                goalItem = QtWidgets.QTableWidgetItem(str(goalVertex.id)) 
-                goalItem.setTextAlignment(QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter)
-                distanceItem = QtWidgets.QTableWidgetItem(str(distances[vertices.index(goalVertex)])) 
-                distanceItem.setTextAlignment(QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter)
-            
-                self.pathTableWidget.setItem(rowIndex, 0, startItem)
-                self.pathTableWidget.setItem(rowIndex, 1, goalItem)
-                self.pathTableWidget.setItem(rowIndex, 2, distanceItem)
-                rowIndex += 1
+        vertexIds = [vertex.id for vertex in self.graph.core.vertices]
+        self.pathModel.setResults(djisktra.paths, vertexIds, djisktra.distances, startIndex)
 
     def _updatePathTableFloyd(self):
-        self.pathTableWidget.setRowCount(0)
-
-        paths = self.graph.floyd.paths
-        if not paths:
-            return
-
-        vertices = self.graph.vertices
-        distances = self.graph.floyd.distances
-
-        rows = len(vertices) * (len(vertices) - 1)
-        verticalHeaders = ["Show Path"] * rows
-
-        self.pathTableWidget.setRowCount(rows)
-        self.pathTableWidget.setVerticalHeaderLabels(verticalHeaders)
-
-        rowIndex = 0
-        for startVertex in vertices:
-            for goalVertex in vertices:
-                if startVertex != goalVertex:
-                    startIndex = vertices.index(startVertex)
-                    goalIndex = vertices.index(goalVertex)
-
-                    startItem = QtWidgets.QTableWidgetItem(str(startVertex.id)) 
-                    startItem.setTextAlignment(QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter)
-                    goalItem = QtWidgets.QTableWidgetItem(str(goalVertex.id)) 
-                    goalItem.setTextAlignment(QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter)
-                    distanceItem = QtWidgets.QTableWidgetItem(str(distances[startIndex][goalIndex])) 
-                    distanceItem.setTextAlignment(QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter)
-                
-                    self.pathTableWidget.setItem(rowIndex, 0, startItem)
-                    self.pathTableWidget.setItem(rowIndex, 1, goalItem)
-                    self.pathTableWidget.setItem(rowIndex, 2, distanceItem)
-                    rowIndex += 1
\ No newline at end of file
+        floyd = self.graph.floyd
+        vertexIds = [vertex.id for vertex in self.graph.core.vertices]
+        self.pathModel.setResults(floyd.paths, vertexIds, floyd.distances)
@@ -0,0 +1,202 @@
+import math
+from array import array
+from PyQt5 import QtCore
+
+from ..model.graph import Graph
+
+class AdjacencyMatrixModel(QtCore.QAbstractTableModel):
+    # Virtual adjacency matrix that reads straight from the graph's sparse
+    # adjacency, so the view only asks for the cells it shows
+
+    def __init__(self, graph: Graph):
+        super().__init__()
+        self.graph = graph
+        self._adjacency = graph.core.getAdjacency()  # Snapshot the cells are read from
+        self._vertexIds: list[int] = []
+        self._hasEdges = bytearray()    # Vertices with no edge show infinity on the diagonal
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._vertexIds)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._vertexIds)
+
+    def data(self, index: QtCore.QModelIndex, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or role != QtCore.Qt.DisplayRole:
+            return None
+
+        row, column = index.row(), index.column()
+        if row == column and not self._hasEdges[row]:
+            return str(math.inf)
+        return str(self._adjacency.weight(row, column))
+
+    def refresh(self):
+        core = self.graph.core
+        adjacency = core.getAdjacency()
+        vertexIds = [vertex.id for vertex in core.vertices]
+        hasEdges = bytearray(bool(core.degree(id)) for id in vertexIds)
+
+        # Added or removed vertices change the shape, which is cheap to reset
+        # since there are no per-cell items
+        if vertexIds != self._vertexIds:
+            self.beginResetModel()
+            self._adjacency, self._vertexIds, self._hasEdges = adjacency, vertexIds, hasEdges
+            self.endResetModel()
+            return
+
+        previous, previousHasEdges = self._adjacency, self._hasEdges
+        self._adjacency, self._hasEdges = adjacency, hasEdges
+
+        # Only signal the cells of the rows that differ from the last snapshot
+        for row in range(len(vertexIds)):
+            changed = self._changedColumns(previous, adjacency, row)
+            if previousHasEdges[row] != hasEdges[row]:
+                changed.add(row)
+            if changed:
+                self.dataChanged.emit(self.index(row, min(changed)), self.index(row, max(changed)))
+
+    @staticmethod
+    def _changedColumns(previous, current, row: int):
+        start, end = previous.indptr[row], previous.indptr[row + 1]
+        oldIndices, oldWeights = previous.indices[start:end], previous.weights[start:end]
+        start, end = current.indptr[row], current.indptr[row + 1]
+        newIndices, newWeights = current.indices[start:end], current.weights[start:end]
+
+        # Most rows are untouched, compare the slices before building sets
+        if oldIndices == newIndices and oldWeights == newWeights:
+            return set()
+        return {column for column, _ in set(zip(oldIndices, oldWeights)) ^ set(zip(newIndices, newWeights))}
+
+
+class PathTableModel(QtCore.QAbstractTableModel):
+    # Virtual path table over the solver distances. Rows are computed on
+    # demand, filtering and sorting only keep an array of row numbers.
+    HEADERS = ["Start", "Goal", "Distance"]
+
+    def __init__(self):
+        super().__init__()
+        self._vertexIds: list[int] = []
+        self._distances = []
+        self._startIndex: int | None = None     # Set for single source results
+        self._rows: array | None = None   # Filtered and sorted rows, None keeps every row in order
+        self._results = None    # Solver paths the table was filled from
+
+        self.reachableOnly = False  # Hide pairs without a path
+        self.minDistance: float | None = None   # Only show distances greater than this
+        self._sortColumn = -1
+        self._sortOrder = QtCore.Qt.AscendingOrder
+
+    def setResults(self, paths, vertexIds: list[int], distances, startIndex: int | None = None):
+        # Single source results pass the start index, all pairs results don't
+        if paths and paths is self._results and vertexIds == self._vertexIds:
+            return  # Same solve as the one shown
+
+        self.beginResetModel()
+        self._results = paths
+        if paths:
+            self._vertexIds, self._distances, self._startIndex = vertexIds, distances, startIndex
+        else:
+            self._vertexIds, self._distances, self._startIndex = [], [], None
+        self._rows = self._filterAndSort()
+        self.endResetModel()
+
+    def setFilter(self, reachableOnly: bool = False, minDistance: float | None = None):
+        self.beginResetModel()
+        self.reachableOnly = reachableOnly
+        self.minDistance = minDistance
+        self._rows = self._filterAndSort()
+        self.endResetModel()
+
+    def sort(self, column: int, order=QtCore.Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self._sortColumn, self._sortOrder = column, order
+        self._rows = self._filterAndSort()
+        self.layoutChanged.emit()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows) if self._rows is not None else self._sourceCount()
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QtCore.QModelIndex, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == QtCore.Qt.TextAlignmentRole:
+            return QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter
+        if role != QtCore.Qt.DisplayRole:
+            return None
+
+        start, goal = self.getPair(index.row())
+        column = index.column()
+        if column == 0:
+            return str(self._vertexIds[start])
+        elif column == 1:
+            return str(self._vertexIds[goal])
+        return str(self._distance(start, goal))
+
+    def headerData(self, section: int, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Horizontal:
+            return self.HEADERS[section]
+        return "Show Path"
+
+    def getPair(self, row: int):
+        # Start and goal vertex indices shown on a row
+        if self._rows is not None:
+            row = self._rows[row]
+        return self._sourcePair(row)
+
+    def getVertexIds(self, row: int):
+        start, goal = self.getPair(row)
+        return self._vertexIds[start], self._vertexIds[goal]
+
+    def _sourceCount(self):
+        n = len(self._vertexIds)
+        if n == 0:
+            return 0
+        return n - 1 if self._startIndex is not None else n * (n - 1)
+
+    def _sourcePair(self, row: int):
+        # Rows skip the start vertex itself, in the order of the vertex list
+        if self._startIndex is not None:
+            return self._startIndex, row + (row >= self._startIndex)
+        start, offset = divmod(row, len(self._vertexIds) - 1)
+        return start, offset + (offset >= start)
+
+    def _distance(self, start: int, goal: int):
+        if self._startIndex is not None:
+            return self._distances[goal]
+        return self._distances[start][goal]
+
+    def _filterAndSort(self):
+        isFiltered = self.reachableOnly or self.minDistance is not None
+        if not isFiltered and self._sortColumn < 0:
+            return None
+
+        rows = range(self._sourceCount())
+        if isFiltered:
+            rows = (row for row in rows if self._accepts(row))
+
+        if self._sortColumn >= 0:
+            keys = [
+                lambda start, goal: self._vertexIds[start],
+                lambda start, goal: self._vertexIds[goal],
+                self._distance,
+            ]
+            key = keys[self._sortColumn]
+            rows = sorted(
+                rows,
+                key=lambda row: key(*self._sourcePair(row)),
+                reverse=self._sortOrder == QtCore.Qt.DescendingOrder,
+            )
+        return array("q", rows)
+
+    def _accepts(self, row: int):
+        distance = self._distance(*self._sourcePair(row))
+        if self.reachableOnly and distance == math.inf:
+            return False
+        return self.minDistance is None or distance > self.minDistance
@@ -1,4 +1,5 @@
 
+import os
 from PyQt5 import QtCore, QtGui, QtWidgets
 from ..model.graph import Graph
 from ..model.edge import Edge
@@ -6,9 +7,15 @@ from ..gui.view import View
 from .side_panel import TopPanel
 
 class UI_MainWindow(object):
+    FILE_FILTER = "Graph files (*.graph);;JSON graph files (*.json)"
+    IMPORT_FILTER = "Graphs (*.graph *.json *.edgelist *.edges *.txt *.csv *.tsv *.graphml);;" + FILE_FILTER + (
+        ";;Edge lists (*.edgelist *.edges *.txt);;CSV files (*.csv *.tsv);;GraphML files (*.graphml)"
+    )
+
     def __init__(self, MainWindow: QtWidgets.QMainWindow) -> None:
         self.mainWindow = MainWindow
         self.mainWindow.setObjectName("mainWindow")
+        self.isDebugging = bool(os.environ.get("GRAPH_DEBUG"))  # Shows the scene item count
 
         self.mainLayout = QtWidgets.QHBoxLayout()
         viewLayout = QtWidgets.QVBoxLayout()
@@ -28,12 +35,19 @@ class UI_MainWindow(object):
     def retranslateUi(self):
         _translate = QtCore.QCoreApplication.translate
         
+        self.menuFile.setTitle(_translate("MainWindow", "File"))
         self.menuAdd.setTitle(_translate("MainWindow", "Add"))
         self.menuEdit.setTitle(_translate("MainWindow", "Edit"))
         self.menuDelete.setTitle(_translate("MainWindow", "Delete"))
         self.menuShow.setTitle(_translate("MainWindow", "Show"))
         self.subMenuShowPath.setTitle(_translate("MainWindow", "Path"))
 
+        self.actionOpen.setText(_translate("MainWindow", "Open..."))
+        self.actionOpen.setShortcut(_translate("MainWindow", "Ctrl+O"))
+
+        self.actionSave.setText(_translate("MainWindow", "Save As..."))
+        self.actionSave.setShortcut(_translate("MainWindow", "Ctrl+S"))
+
         self.actionDelete.setText(_translate("MainWindow", "Delete"))
         self.actionDelete.setShortcut(_translate("MainWindow", "Delete"))
 
@@ -56,6 +70,14 @@ class UI_MainWindow(object):
         self.actionDjisktra.setShortcut(_translate("MainWindow", "D"))
         self.actionFloyd.setText(_translate("MainWindow", "Floyd"))
         self.actionFloyd.setShortcut(_translate("MainWindow", "F"))
+        self.actionRoute.setText(_translate("MainWindow", "Route"))
+        self.actionRoute.setShortcut(_translate("MainWindow", "R"))
+        self.actionGeometricWeights.setText(_translate("MainWindow", "Geometric Weights"))
+
+        self.subMenuAllPairs.setTitle(_translate("MainWindow", "All Pairs Engine"))
+        self.actionAllPairsAuto.setText(_translate("MainWindow", "Auto"))
+        self.actionAllPairsFloyd.setText(_translate("MainWindow", "Floyd-Warshall"))
+        self.actionAllPairsJohnson.setText(_translate("MainWindow", "Johnson"))
 
     def setUpMenuBar(self):
         self.centralwidget = QtWidgets.QWidget(self.mainWindow)
@@ -69,6 +91,9 @@ class UI_MainWindow(object):
         self.menubar.setObjectName("menubar")
 
         # Menu items
+        self.menuFile = QtWidgets.QMenu(self.menubar)
+        self.menuFile.setObjectName("menuFile")
+
         self.menuAdd = QtWidgets.QMenu(self.menubar)
         self.menuAdd.setObjectName("menuAdd")
 
@@ -84,13 +109,26 @@ class UI_MainWindow(object):
         self.subMenuShowPath = QtWidgets.QMenu(self.menuShow)
         self.subMenuShowPath.setObjectName("subMenuShowPath")
 
+        self.subMenuAllPairs = QtWidgets.QMenu(self.subMenuShowPath)
+        self.subMenuAllPairs.setObjectName("subMenuAllPairs")
+
         self.mainWindow.setMenuBar(self.menubar)
 
         self.statusbar = QtWidgets.QStatusBar(self.mainWindow)
         self.statusbar.setObjectName("statusbar")
         self.mainWindow.setStatusBar(self.statusbar)
+        self.graph.solveFailed.connect(lambda message: self.statusbar.showMessage(f"Solve failed: {message}"))
+        self.graph.edgesHidden.connect(
+            lambda count: self.statusbar.showMessage(f"{count} edges are too many to draw, the adjacency matrix lists them")
+        )
 
         # Menu Actions
+        self.actionOpen = QtWidgets.QAction(self.mainWindow)
+        self.actionOpen.setObjectName("actionOpen")
+
+        self.actionSave = QtWidgets.QAction(self.mainWindow)
+        self.actionSave.setObjectName("actionSave")
+
         self.actionAddVertex = QtWidgets.QAction(self.mainWindow)
         self.actionAddVertex.setObjectName("actionAddVertex")
 
@@ -118,6 +156,29 @@ class UI_MainWindow(object):
         self.actionFloyd = QtWidgets.QAction(self.mainWindow)
         self.actionFloyd.setObjectName("actionShowEdgeSet")
 
+        self.actionRoute = QtWidgets.QAction(self.mainWindow)
+        self.actionRoute.setObjectName("actionRoute")
+
+        # Declares that the weights follow the canvas distances, so routes can use A*
+        self.actionGeometricWeights = QtWidgets.QAction(self.mainWindow)
+        self.actionGeometricWeights.setObjectName("actionGeometricWeights")
+        self.actionGeometricWeights.setCheckable(True)
+
+        # Engine used by the all pairs solve, only one can be checked
+        self.allPairsActions = QtWidgets.QActionGroup(self.mainWindow)
+        self.actionAllPairsAuto = self.allPairsActions.addAction(QtWidgets.QAction(self.mainWindow))
+        self.actionAllPairsAuto.setObjectName("actionAllPairsAuto")
+        self.actionAllPairsFloyd = self.allPairsActions.addAction(QtWidgets.QAction(self.mainWindow))
+        self.actionAllPairsFloyd.setObjectName("actionAllPairsFloyd")
+        self.actionAllPairsJohnson = self.allPairsActions.addAction(QtWidgets.QAction(self.mainWindow))
+        self.actionAllPairsJohnson.setObjectName("actionAllPairsJohnson")
+        for action in self.allPairsActions.actions():
+            action.setCheckable(True)
+        self.actionAllPairsAuto.setChecked(True)
+
+        self.menuFile.addAction(self.actionOpen)
+        self.menuFile.addAction(self.actionSave)
+
         self.menuAdd.addAction(self.actionAddVertex)
         self.menuAdd.addAction(self.actionAddEdge)
 
@@ -128,16 +189,27 @@ class UI_MainWindow(object):
 
         self.subMenuShowPath.addAction(self.actionDjisktra)
         self.subMenuShowPath.addAction(self.actionFloyd)
+        self.subMenuShowPath.addAction(self.actionRoute)
+        self.subMenuShowPath.addSeparator()
+        self.subMenuShowPath.addMenu(self.subMenuAllPairs)
+        self.subMenuShowPath.addAction(self.actionGeometricWeights)
+
+        self.subMenuAllPairs.addAction(self.actionAllPairsAuto)
+        self.subMenuAllPairs.addAction(self.actionAllPairsFloyd)
+        self.subMenuAllPairs.addAction(self.actionAllPairsJohnson)
 
         self.menuShow.addMenu(self.subMenuShowPath)
         self.menuShow.addAction(self.actionShowComplement)
 
+        self.menubar.addAction(self.menuFile.menuAction())
         self.menubar.addAction(self.menuAdd.menuAction())
         self.menubar.addAction(self.menuEdit.menuAction())
         self.menubar.addAction(self.menuDelete.menuAction())
         self.menubar.addAction(self.menuShow.menuAction())
 
         # Setting callbacks to actions
+        self.actionOpen.triggered.connect(self.openCallback)
+        self.actionSave.triggered.connect(self.saveCallback)
         self.actionAddVertex.triggered.connect(lambda: self.addCallback("vertex"))
         self.actionAddEdge.triggered.connect(lambda: self.addCallback("edge"))
         self.actionEditWeight.triggered.connect(self.editCallback)
@@ -146,9 +218,57 @@ class UI_MainWindow(object):
         self.actionShowComplement.triggered.connect(self.showComplementCallback)
         self.actionDjisktra.triggered.connect(self.djisktraCallback)
         self.actionFloyd.triggered.connect(self.floydCallback)
+        self.actionRoute.triggered.connect(self.routeCallback)
+        self.actionGeometricWeights.toggled.connect(self.geometricWeightsCallback)
+        self.actionAllPairsAuto.triggered.connect(lambda: self.allPairsCallback("auto"))
+        self.actionAllPairsFloyd.triggered.connect(lambda: self.allPairsCallback("floyd"))
+        self.actionAllPairsJohnson.triggered.connect(lambda: self.allPairsCallback("johnson"))
 
         self.updateMenuActions()
 
+    def openCallback(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self.mainWindow, "Open Graph", "", self.IMPORT_FILTER)
+        if not path:
+            return
+
+        # Large imports report their progress, the window stays blocked meanwhile
+        dialog = QtWidgets.QProgressDialog("Reading the graph...", None, 0, 100, self.mainWindow)
+        dialog.setWindowModality(QtCore.Qt.WindowModal)
+        dialog.setMinimumDuration(500)
+
+        def progress(done, total):
+            dialog.setValue(done * 100 // total if total else 100)
+
+        self.graph.djisktra.reset()
+        self.graph.floyd.reset()
+        self.graph.isUsingFloyd = False
+        self.view.doneButton.setVisible(False)
+        try:
+            self.graph.loadGraph(path, progress)
+        except (OSError, KeyError, ValueError, SyntaxError) as e:    # Malformed XML raises a SyntaxError
+            self._showFileError("Open Failed", f"Couldn't open {path}: {e}")
+        finally:
+            dialog.close()
+        self.update()
+
+    def saveCallback(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self.mainWindow, "Save Graph", "", self.FILE_FILTER)
+        if not path:
+            return
+
+        try:
+            self.graph.saveGraph(path)
+        except OSError as e:
+            self._showFileError("Save Failed", f"Couldn't save {path}: {e}")
+
+    def _showFileError(self, title, text):
+        msg_box = QtWidgets.QMessageBox()
+        msg_box.setIcon(QtWidgets.QMessageBox.Warning)
+        msg_box.setWindowTitle(title)
+        msg_box.setText(text)
+        msg_box.setStandardButtons(QtWidgets.QMessageBox.Ok)
+        msg_box.exec_()
+
     def addCallback(self, action):
         if action == "vertex":
             self.graph.isAddingVertex = True
@@ -162,6 +282,7 @@ class UI_MainWindow(object):
 
         self.graph.isUsingDjisktra = False
         self.graph.isUsingFloyd = False
+        self.graph.isUsingRoute = False
         self.graph.unSelectItems()
         self.view.setAdding(True)
         self.update()
@@ -236,6 +357,7 @@ class UI_MainWindow(object):
         self.graph.floyd.reset()
         self.graph.isUsingDjisktra = False
         self.graph.isUsingFloyd = False
+        self.graph.isUsingRoute = False
         self.view.doneButton.setVisible(False)
         self.graph.setHighlightItems(False)
         self.graph.getComplement()
@@ -249,8 +371,21 @@ class UI_MainWindow(object):
         if not self.graph.isAddingEdge and not self.graph.isAddingVertex:
             self.view.findPath("floyd")
 
+    def routeCallback(self):
+        if not self.graph.isAddingEdge and not self.graph.isAddingVertex:
+            self.view.findPath("route")
+
+    def geometricWeightsCallback(self, isChecked):
+        self.graph.hasGeometricWeights = isChecked
+
+    def allPairsCallback(self, algorithm):
+        self.graph.allPairsAlgorithm = algorithm
+        # Solve again with the new engine if all pairs paths are shown
+        if self.graph.isUsingFloyd:
+            self.view.findPath("floyd")
+
     def updateMenuActions(self):
-        if not self.graph.vertices:
+        if not self.graph.core.vertices:
             self.actionEditWeight.setEnabled(False)
             self.actionDelete.setEnabled(False)
             self.actionDeleteAll.setEnabled(False)
@@ -259,21 +394,29 @@ class UI_MainWindow(object):
             self.actionDelete.setEnabled(True)
             self.actionDeleteAll.setEnabled(True)
 
-        if not self.graph.edges:
+        if not self.graph.core.edgeCount:
             self.actionShowComplement.setEnabled(False)
             self.actionShowPath.setEnabled(False)
             self.actionEditWeight.setEnabled(False)
             self.actionDjisktra.setEnabled(False)
             self.actionFloyd.setEnabled(False)
+            self.actionRoute.setEnabled(False)
         else: 
             self.actionShowComplement.setEnabled(True)
             self.actionShowPath.setEnabled(True)
             self.actionEditWeight.setEnabled(True)
             self.actionDjisktra.setEnabled(True)
             self.actionFloyd.setEnabled(True)
+            self.actionRoute.setEnabled(True)
 
     def update(self):
         self.topPanel.update()
         self.view.update()
         self.graph.update()
-        self.updateMenuActions()
\ No newline at end of file
+        self.updateMenuActions()
+
+        if self.isDebugging:
+            self.statusbar.showMessage(
+                f"Scene items: {self.graph.getItemCount()}"
+                f"  Solve cache: {self.graph.cacheHits} hits, {self.graph.cacheMisses} misses"
+            )
\ No newline at end of file
@@ -7,6 +7,14 @@ class View(QtWidgets.QGraphicsView):
     def __init__(self, graph: Graph, layout: QtWidgets.QVBoxLayout, updateSidePanel, updateMenu):
         super().__init__(graph)
         self.graph = graph
+
+        # Edges of large graphs get their items once they scroll into view,
+        # checked after the scrolling or resizing pauses
+        self.visibleEdgesTimer = QtCore.QTimer(self)
+        self.visibleEdgesTimer.setSingleShot(True)
+        self.visibleEdgesTimer.setInterval(100)
+        self.visibleEdgesTimer.timeout.connect(self.showVisibleEdges)
+
         self.graph.setSceneRect(0, 0, 1280, 840)  # Size of the scene
         self.graph.selectionChanged.connect(self.selectPoint)
 
@@ -43,11 +51,23 @@ class View(QtWidgets.QGraphicsView):
         painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
         super().paintEvent(event)
 
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        self.visibleEdgesTimer.start()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.visibleEdgesTimer.start()
+
+    def showVisibleEdges(self):
+        self.graph.showEdgesIn(self.mapToScene(self.viewport().rect()).boundingRect())
+
     def selectPoint(self):
         self.graph.createEdge()
         self.graph.useDjisktra()
         self.updateSidePanel()
         self.graph.showPath(None, None)
+        self.graph.useRoute()
 
     def keyPressEvent(self, event):
         if event.key() == QtCore.Qt.Key_Escape:
@@ -56,6 +76,7 @@ class View(QtWidgets.QGraphicsView):
             super().keyPressEvent(event)
 
     def update(self):
+        self.showVisibleEdges()
         self.graph.update()
         self.updateSidePanel()
         super().update()
@@ -76,24 +97,36 @@ class View(QtWidgets.QGraphicsView):
             self.doneButton.setVisible(True)
             self.graph.isUsingDjisktra = True
             self.graph.isUsingFloyd = False
+            self.graph.isUsingRoute = False
             self.graph.floyd.reset()
             self.graph.useDjisktra()
         elif algorithm == "floyd":
             self.doneButton.setVisible(True)
             self.graph.isUsingDjisktra = False
             self.graph.isUsingFloyd = True
+            self.graph.isUsingRoute = False
             self.graph.djisktra.reset()
             self.graph.useFloyd()
+        elif algorithm == "route":
+            self.doneButton.setVisible(True)
+            self.graph.isUsingDjisktra = False
+            self.graph.isUsingFloyd = False
+            self.graph.isUsingRoute = True
+            self.graph.djisktra.reset()
+            self.graph.floyd.reset()
+            self.graph.cancelSolve()
         else:
             self.doneButton.setVisible(False)
             self.graph.isUsingDjisktra = False
             self.graph.isUsingFloyd = False
+            self.graph.isUsingRoute = False
+            self.graph.cancelSolve()
         self.update()
         
     def doneButtonCallback(self):
         if self.graph.isAddingEdge or self.graph.isAddingVertex:
                 self.setAdding(False)
-        if self.graph.isUsingDjisktra or self.graph.isUsingFloyd:
+        if self.graph.isUsingDjisktra or self.graph.isUsingFloyd or self.graph.isUsingRoute:
             self.findPath(None)
             self.graph.showPath(None, None)
         self.update()
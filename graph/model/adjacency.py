@@ -0,0 +1,91 @@
+import math
+import operator
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import accumulate, islice, repeat
+from typing import Iterable, Sequence
+
+class SparseAdjacency:
+    # Compressed sparse row (CSR) adjacency of a weighted directed graph.
+    # The outgoing edges of the vertex at index i are
+    # indices[indptr[i]:indptr[i + 1]] with the matching weights, sorted by
+    # target index. Weights are stored as integers while every weight is an
+    # integer, otherwise as floats.
+
+    def __init__(self, size: int = 0, edges: Iterable[tuple[int, int, float]] = ()) -> None:
+        edges = sorted(edges)   # Order by (start, end) to lay out the rows
+        self.size = size
+        self.indptr = array("q", [0] * (size + 1))
+        self.indices = array("i", (end for _, end, _ in edges))
+
+        isIntegral = all(isinstance(weight, int) for _, _, weight in edges)
+        self.weights = array("q" if isIntegral else "d", (weight for _, _, weight in edges))
+
+        # Count the edges of each row, then accumulate the counts into offsets
+        for start, _, _ in edges:
+            self.indptr[start + 1] += 1
+        for i in range(size):
+            self.indptr[i + 1] += self.indptr[i]
+
+    @classmethod
+    def fromColumns(cls, size: int, starts: Sequence[int], ends: Sequence[int], weights: Sequence[float]):
+        # Same rows from parallel columns of start indices, end indices and
+        # weights, without a tuple per edge. Each edge gets the integer key
+        # start * size + end, one sort of the keys orders the rows and a
+        # repeated key is a repeated edge.
+        adjacency = cls(size)
+        keys = list(map(operator.add, map(operator.mul, starts, repeat(size)), ends))
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        keys = list(map(keys.__getitem__, order))
+        if any(map(operator.eq, keys, islice(keys, 1, None))):
+            raise ValueError("Edges must be new, unique and not loops.")
+
+        if isinstance(weights, array):
+            isIntegral = weights.typecode == "q"
+        else:
+            isIntegral = all(isinstance(weight, int) for weight in weights)
+        adjacency.indices = array("i", map(operator.mod, keys, repeat(size)))
+        adjacency.weights = array("q" if isIntegral else "d", map(weights.__getitem__, order))
+
+        counts = Counter(starts)
+        adjacency.indptr = array("q", [0])
+        adjacency.indptr.extend(accumulate(map(counts.__getitem__, range(size))))
+        return adjacency
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def edgeCount(self):
+        return len(self.indices)
+
+    def neighbors(self, index: int):
+        # Outgoing (index, weight) pairs of a vertex
+        begin, end = self.indptr[index], self.indptr[index + 1]
+        return zip(self.indices[begin:end], self.weights[begin:end])
+
+    def weight(self, start: int, end: int):
+        if start == end:
+            return 0
+        begin, stop = self.indptr[start], self.indptr[start + 1]
+        position = bisect_left(self.indices, end, begin, stop)
+        if position < stop and self.indices[position] == end:
+            return self.weights[position]
+        return math.inf
+
+    def transpose(self):
+        # The same graph with every edge reversed, for searches that run backwards
+        return SparseAdjacency(self.size, (
+            (end, start, weight) for start in range(self.size) for end, weight in self.neighbors(start)
+        ))
+
+    def toDense(self):
+        # Dense matrix with math.inf for missing edges, only meant for small graphs
+        matrix = [[math.inf] * self.size for _ in range(self.size)]
+        for i in range(self.size):
+            row = matrix[i]
+            row[i] = 0
+            for j, weight in self.neighbors(i):
+                row[j] = weight
+        return matrix
@@ -0,0 +1,416 @@
+import gc
+import math
+import operator
+from array import array
+from contextlib import contextmanager
+
+from .adjacency import SparseAdjacency
+from ..algorithm.batch import DjisktraBatch
+from ..algorithm.djisktra import Djisktra
+from ..algorithm.floyd import FloydWarshall
+from ..algorithm.johnson import Johnson
+from ..algorithm.route import Route
+
+@contextmanager
+def pausedCollection():
+    # Bulk inserts allocate millions of records that all stay alive, so the
+    # cyclic garbage collector would only rescan them over and over
+    wasEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if wasEnabled:
+            gc.enable()
+
+
+class VertexRecord:
+    # A vertex of the core model, its position is the center on the canvas
+    __slots__ = ("id", "x", "y")
+
+    def __init__(self, id: int, x: float = 0.0, y: float = 0.0) -> None:
+        self.id = id
+        self.x = x
+        self.y = y
+
+    def __repr__(self):
+        return f"VertexRecord({self.id}, {self.x}, {self.y})"
+
+
+class EdgeRecord:
+    # A directed weighted edge between two vertex ids
+    __slots__ = ("start", "end", "weight")
+
+    def __init__(self, start: int, end: int, weight: float = math.inf) -> None:
+        self.start = start
+        self.end = end
+        self.weight = weight
+
+    def getKey(self):
+        return (self.start, self.end)
+
+    def __repr__(self):
+        return f"EdgeRecord({self.start}, {self.end}, {self.weight})"
+
+
+class GraphModel:
+    # Pure Python graph without any Qt objects, so the algorithms can run
+    # headless. Vertices keep their insertion order, which is also the index
+    # order of the sparse adjacency. Edges are kept by (start id, end id) and
+    # every vertex has sets of its outgoing and incoming neighbor ids.
+    # The version is bumped on every change to the vertices, edges or weights.
+    # Edges bulk loaded into a graph without edges stay in their columns until
+    # the edge map or the neighbor sets are first used, the adjacency is
+    # built straight from the columns.
+
+    # Measured cost of one Dijkstra edge and vertex visit in Johnson, counted
+    # in Floyd-Warshall relaxations with and without NumPy
+    JOHNSON_COSTS = {True: (30, 330), False: (2, 20)}
+
+    def __init__(self) -> None:
+        self.vertices: list[VertexRecord] = []
+        self.vertexIndex: dict[int, int] = {}   # Position in the vertices list by vertex id
+        self.vertexById: dict[int, VertexRecord] = {}
+        self._edges: dict[tuple[int, int], EdgeRecord] = {}  # In insertion order
+        self._outgoing: dict[int, set[int]] = {}
+        self._incoming: dict[int, set[int]] = {}
+        self._edgeColumns: tuple | None = None  # Bulk loaded (starts, ends, weights) not in the maps yet
+        self.version = 0
+
+        self._adjacency = SparseAdjacency()
+        self._adjacencyVersion = 0  # Version the sparse adjacency was built from
+        self._reverseAdjacency = SparseAdjacency()
+        self._reverseVersion = 0    # Version the reversed adjacency was built from
+        self._heuristicScale = 0.0
+        self._heuristicVersion = -1     # Version the heuristic scale was computed for
+
+    def __len__(self):
+        return len(self.vertices)
+
+    @property
+    def edges(self):
+        if self._edgeColumns is not None:
+            self._fillEdgeMaps()
+        return self._edges
+
+    @property
+    def outgoing(self):
+        if self._edgeColumns is not None:
+            self._fillEdgeMaps()
+        return self._outgoing
+
+    @property
+    def incoming(self):
+        if self._edgeColumns is not None:
+            self._fillEdgeMaps()
+        return self._incoming
+
+    @property
+    def edgeCount(self):
+        return len(self._edgeColumns[0]) if self._edgeColumns is not None else len(self._edges)
+
+    def addVertex(self, x: float = 0.0, y: float = 0.0, id: int | None = None):
+        if id is None:
+            id = self.vertices[-1].id + 1 if self.vertices else 1
+        if id in self.vertexById:
+            raise ValueError(f"Vertex {id} already exists.")
+
+        vertex = VertexRecord(id, x, y)
+        self.vertexIndex[id] = len(self.vertices)
+        self.vertexById[id] = vertex
+        self.vertices.append(vertex)
+        self.outgoing[id] = set()
+        self.incoming[id] = set()
+        self.version += 1
+        return vertex
+
+    def moveVertex(self, id: int, x: float, y: float):
+        # Positions don't change any path, so the version stays
+        vertex = self.vertexById[id]
+        vertex.x, vertex.y = x, y
+        self._heuristicVersion = -1     # Edge lengths changed, the scale is computed again
+
+    def addEdge(self, start: int, end: int, weight: float = math.inf):
+        if start not in self.vertexById or end not in self.vertexById:
+            raise KeyError((start, end))
+        if start == end or (start, end) in self.edges:
+            raise ValueError(f"Edge {start} -> {end} can't be added.")
+
+        edge = EdgeRecord(start, end, weight)
+        self.edges[(start, end)] = edge
+        self.outgoing[start].add(end)
+        self.incoming[end].add(start)
+        self.version += 1
+        return edge
+
+    def addVertices(self, ids, xs, ys):
+        # Bulk insert from parallel columns with a single version bump. The
+        # ids are checked up front so a failed insert changes nothing.
+        ids = list(ids)
+        if len(set(ids)) != len(ids) or not self.vertexById.keys().isdisjoint(ids):
+            raise ValueError("Vertex ids must be new and unique.")
+
+        with pausedCollection():
+            records = list(map(VertexRecord, ids, xs, ys))
+            self.vertexIndex.update(zip(ids, range(len(self.vertices), len(self.vertices) + len(ids))))
+            self.vertexById.update(zip(ids, records))
+            self.vertices.extend(records)
+            self.outgoing.update((id, set()) for id in ids)
+            self.incoming.update((id, set()) for id in ids)
+        self.version += 1
+
+    def addEdges(self, starts, ends, weights):
+        # Bulk insert from parallel columns with a single version bump. Into a
+        # graph without edges the columns are only checked for unknown ends
+        # and loops, repeated edges raise once the maps or adjacency are built.
+        if self._edgeColumns is None and not self._edges:
+            starts = starts if isinstance(starts, array) else array("q", starts)
+            ends = ends if isinstance(ends, array) else array("q", ends)
+            weights = weights if isinstance(weights, array) else list(weights)
+            if not len(starts) == len(ends) == len(weights):
+                raise ValueError("Edge columns must have the same length.")
+            if not self.vertexById.keys() >= set(starts) | set(ends):
+                raise KeyError("Edges must join existing vertices.")
+            if any(map(operator.eq, starts, ends)):
+                raise ValueError("Edges must be new, unique and not loops.")
+            if starts:
+                self._edgeColumns = (starts, ends, weights)
+            self.version += 1
+            return
+
+        # Otherwise the records are made by map and the edge map is updated in one call
+        with pausedCollection():
+            starts, ends = list(starts), list(ends)
+            keys = list(zip(starts, ends))
+            if not self.vertexById.keys() >= set(starts) | set(ends):
+                raise KeyError("Edges must join existing vertices.")
+            if any(map(operator.eq, starts, ends)) or len(set(keys)) != len(keys) or not self.edges.keys().isdisjoint(keys):
+                raise ValueError("Edges must be new, unique and not loops.")
+
+            self.edges.update(zip(keys, map(EdgeRecord, starts, ends, weights)))
+            outgoing, incoming = self.outgoing, self.incoming
+            for start, end in keys:
+                outgoing[start].add(end)
+                incoming[end].add(start)
+        self.version += 1
+
+    def setWeight(self, start: int, end: int, weight: float):
+        self.edges[(start, end)].weight = weight
+        self.version += 1
+
+    def getWeight(self, start: int, end: int):
+        edge = self.edges.get((start, end))
+        return edge.weight if edge is not None else math.inf
+
+    def getEdge(self, start: int, end: int):
+        return self.edges.get((start, end))
+
+    def hasEdge(self, start: int, end: int):
+        return (start, end) in self.edges
+
+    def neighbors(self, id: int):
+        # Ids joined to the vertex by an edge in either direction
+        return self.outgoing[id] | self.incoming[id]
+
+    def degree(self, id: int):
+        # Number of edges at the vertex, counting both directions
+        return len(self.outgoing[id]) + len(self.incoming[id])
+
+    def incidentEdges(self, id: int):
+        # Keys of the edges leaving and entering the vertex
+        return [(id, end) for end in self.outgoing[id]] + [(start, id) for start in self.incoming[id]]
+
+    def removeEdge(self, start: int, end: int):
+        edge = self.edges.pop((start, end))
+        self.outgoing[start].discard(end)
+        self.incoming[end].discard(start)
+        self.version += 1
+        return edge
+
+    def removeVertices(self, ids):
+        # Removes the vertices and their edges in one pass, each vertex costs
+        # O(degree) and the vertex list is filtered once. Returns the removed edges.
+        ids = {id for id in ids if id in self.vertexById}
+        removed = []
+        for id in ids:
+            for end in self.outgoing.pop(id):
+                removed.append(self.edges.pop((id, end)))
+                if end not in ids:
+                    self.incoming[end].discard(id)
+            for start in self.incoming.pop(id):
+                if start not in ids:
+                    removed.append(self.edges.pop((start, id)))
+                    self.outgoing[start].discard(id)
+            del self.vertexById[id]
+
+        if ids:
+            self.vertices[:] = [vertex for vertex in self.vertices if vertex.id not in ids]
+            self._indexVertices()
+            self.version += 1
+        return removed
+
+    def complement(self):
+        # Replaces the edges with the complement of the undirected neighbor
+        # relation, both directions for every pair that isn't joined. Rows are
+        # bitsets over the vertex index. Returns the new edges in order.
+        n = len(self.vertices)
+        rows = [0] * n
+        for start, end in self.edges:
+            i, j = self.vertexIndex[start], self.vertexIndex[end]
+            rows[i] |= 1 << j
+            rows[j] |= 1 << i
+        everyone = (1 << n) - 1
+
+        self.edges.clear()
+        for id in self.vertexById:
+            self.outgoing[id].clear()
+            self.incoming[id].clear()
+
+        for i, vertex in enumerate(self.vertices):
+            for j in self._iterBits(everyone & ~rows[i] & ~(1 << i)):
+                end = self.vertices[j].id
+                self.edges[(vertex.id, end)] = EdgeRecord(vertex.id, end)
+                self.outgoing[vertex.id].add(end)
+                self.incoming[end].add(vertex.id)
+        self.version += 1
+        return list(self.edges.values())
+
+    @staticmethod
+    def _iterBits(bits: int):
+        # Indices of the set bits, lowest first
+        while bits:
+            lowest = bits & -bits
+            yield lowest.bit_length() - 1
+            bits ^= lowest
+
+    def clear(self):
+        # The version keeps counting, so nothing cached for an older graph matches
+        self.vertices.clear()
+        self.vertexIndex.clear()
+        self.vertexById.clear()
+        self._edgeColumns = None
+        self._edges.clear()
+        self._outgoing.clear()
+        self._incoming.clear()
+        self.version += 1
+
+    def getEdgeColumns(self):
+        # Parallel start id, end id and weight columns of the edges, in order
+        if self._edgeColumns is not None:
+            return self._edgeColumns
+        edges = self._edges.values()
+        return (
+            array("q", (edge.start for edge in edges)),
+            array("q", (edge.end for edge in edges)),
+            [edge.weight for edge in edges],
+        )
+
+    def getAdjacency(self):
+        # Sparse adjacency over the vertex index, rebuilt only after a change.
+        # Built from the columns, so bulk loaded edges need no records.
+        if self._adjacencyVersion != self.version:
+            starts, ends, weights = self.getEdgeColumns()
+            if math.inf in weights:
+                finite = [position for position, weight in enumerate(weights) if weight != math.inf]
+                starts, ends = map(starts.__getitem__, finite), map(ends.__getitem__, finite)
+                weights = list(map(weights.__getitem__, finite))
+            index = self.vertexIndex
+            self._adjacency = SparseAdjacency.fromColumns(
+                len(self.vertices),
+                array("q", map(index.__getitem__, starts)),
+                array("q", map(index.__getitem__, ends)),
+                weights,
+            )
+            self._adjacencyVersion = self.version
+        return self._adjacency
+
+    def getReverseAdjacency(self):
+        # The adjacency with every edge reversed, for searches from the goal
+        if self._reverseVersion != self.version:
+            self._reverseVersion = self.version
+            self._reverseAdjacency = self.getAdjacency().transpose()
+        return self._reverseAdjacency
+
+    def shortestPaths(self, start: int):
+        # Single source paths and distances from the vertex id
+        djisktra = Djisktra(list(self.vertices), dict(self.vertexIndex))
+        djisktra.findPath(self.vertexById[start], self.getAdjacency())
+        return djisktra
+
+    def batchShortestPaths(self, starts: list[int], workers: int | None = None):
+        # Single source results from many vertex ids, split across worker processes
+        batch = DjisktraBatch(list(self.vertices), dict(self.vertexIndex))
+        batch.findPaths([self.vertexById[start] for start in starts], self.getAdjacency(), workers)
+        return batch
+
+    def allPairs(self, algorithm: str = "auto"):
+        # All pairs paths and distances with "floyd", "johnson", or by density
+        if algorithm == "auto":
+            algorithm = self.chooseAllPairs()
+        solver = Johnson(list(self.vertices)) if algorithm == "johnson" else FloydWarshall(list(self.vertices))
+        solver.findPath(self.getAdjacency())
+        return solver
+
+    def chooseAllPairs(self):
+        # The engine with the lower estimated cost. Floyd-Warshall always
+        # takes V^3 steps, Johnson runs V Dijkstras.
+        n, e = len(self.vertices), self.getAdjacency().edgeCount
+        edgeCost, vertexCost = self.JOHNSON_COSTS[FloydWarshall.isVectorized]
+        return "johnson" if n * (e * edgeCost + n * vertexCost) < n ** 3 else "floyd"
+
+    def findRoute(self, start: int, goal: int, geometric: bool = False):
+        # Point to point query between two vertex ids. Geometric weights allow
+        # A*, otherwise both ends are searched at once with Dijkstra.
+        route = Route()
+        adjacency = self.getAdjacency()
+        startIndex, goalIndex = self.vertexIndex[start], self.vertexIndex[goal]
+        if geometric:
+            scale = self.getHeuristicScale()
+            target = self.vertexById[goal]
+
+            def heuristic(index: int):
+                vertex = self.vertices[index]
+                return scale * math.hypot(vertex.x - target.x, vertex.y - target.y)
+            route.findAStar(startIndex, goalIndex, adjacency, heuristic)
+        else:
+            route.findBidirectional(startIndex, goalIndex, adjacency, self.getReverseAdjacency())
+        return route
+
+    def getHeuristicScale(self):
+        # Weight per unit of canvas distance on the cheapest edge. Scaling the
+        # straight line distance by it never overestimates the rest of a route.
+        # Only rescanned after a change, so each query stays local
+        if self._heuristicVersion != self.version:
+            self._heuristicVersion = self.version
+            self._heuristicScale = self._computeHeuristicScale()
+        return self._heuristicScale
+
+    def _computeHeuristicScale(self):
+        scale = math.inf
+        for edge in self.edges.values():
+            start, end = self.vertexById[edge.start], self.vertexById[edge.end]
+            length = math.hypot(start.x - end.x, start.y - end.y)
+            if length > 0 and edge.weight != math.inf:
+                scale = min(scale, edge.weight / length)
+        return scale if scale != math.inf else 0
+
+    def _fillEdgeMaps(self):
+        # Makes the records and neighbor sets of bulk loaded edges. Repeated
+        # edges raise and leave the columns, so every later use raises too.
+        starts, ends, weights = self._edgeColumns
+        keys = list(zip(starts, ends))
+        if len(set(keys)) != len(keys):
+            raise ValueError("Edges must be new, unique and not loops.")
+
+        self._edgeColumns = None
+        with pausedCollection():
+            self._edges.update(zip(keys, map(EdgeRecord, starts, ends, weights)))
+            outgoing, incoming = self._outgoing, self._incoming
+            for start, end in keys:
+                outgoing[start].add(end)
+                incoming[end].add(start)
+
+    def _indexVertices(self):
+        # Update in place, the algorithms hold a reference to the map
+        self.vertexIndex.clear()
+        self.vertexIndex.update((vertex.id, index) for index, vertex in enumerate(self.vertices))
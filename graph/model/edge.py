@@ -1,29 +1,50 @@
 import math
 from PyQt5 import QtCore, QtGui, QtWidgets
 
+from .core import EdgeRecord
+
 class Edge(QtWidgets.QGraphicsPathItem):
     from .vertex import Vertex
 
-    def __init__(self, start: Vertex, end: Vertex):
+    def __init__(self, start: Vertex, end: Vertex, record: EdgeRecord, isCurve: bool = False, deferGeometry: bool = False):
         super().__init__()
         self.start_vertex = start
         self.end_vertex = end
-        self.weight = math.inf
+        self.record = record    # The core's edge, the weight is read from it
         self.isHighlighted = False
-        self.isCurve = False
+        self.isCurve = isCurve  # Known up front when edges are created in bulk
+        self._geometryKey = None    # Endpoint positions and curvature of the cached geometry
+        self.weightLabel: QtWidgets.QGraphicsTextItem | None = None   # Created with the first weight
 
         self.setFlag(QtWidgets.QGraphicsLineItem.ItemIsSelectable, True)  
         self.setCursor(QtCore.Qt.PointingHandCursor)  
         self.setPen(QtGui.QPen(QtCore.Qt.black, 2))   # Set the edge color and thickness
-        self._updatePath()
-        self._addLabel()
         self._addArrowHead()
 
+        # Edges created in bulk get their geometry later from applyGeometry
+        if not deferGeometry:
+            self._updatePath()
+            self._refreshLabel()
+            self._updateArrowHead()
+            self._geometryKey = self.getGeometryKey()
+
     def __eq__(self, other_edge):
         # Check if two edges are equal according to vertex order
         if isinstance(other_edge, Edge):
             return (self.start_vertex == other_edge.start_vertex and self.end_vertex == other_edge.end_vertex)
 
+    def __hash__(self):
+        # Consistent with __eq__, equal edges share the same endpoints
+        return hash((self.start_vertex, self.end_vertex))
+
+    @property
+    def weight(self):
+        return self.record.weight
+
+    def getKey(self):
+        # Key of the edge in the core and in the graph's edge items
+        return (self.record.start, self.record.end)
+
     def getOpposite(self, vertex):
         # Return the neighbor of the vertex
         if vertex == self.start_vertex:
@@ -34,10 +55,31 @@ class Edge(QtWidgets.QGraphicsPathItem):
     def getStart(self):
         return self.start_vertex
 
-    def paint(self, painter, option, widget=None):
+    def getGeometryKey(self):
+        # Endpoint positions and curvature, the path only changes with these
+        start = self.start_vertex.pos()
+        end = self.end_vertex.pos()
+        return (start.x(), start.y(), end.x(), end.y(), self.isCurve)
+
+    def updateGeometry(self):
+        # Recompute the cached path, label position and arrowhead, but only
+        # when an endpoint moved or the curvature changed since the last time
+        geometry = self.getGeometryKey()
+        if geometry == self._geometryKey:
+            return
+        self._geometryKey = geometry
         self._updatePath()
-        self._updateLabel(self.weightLabel)
+        if self.weightLabel is not None:
+            self._updateLabel(self.weightLabel)
         self._updateArrowHead()
+
+    def itemChange(self, change, value):
+        if change == QtWidgets.QGraphicsItem.ItemSelectedHasChanged:
+            self._updateArrowStyle()
+        return super().itemChange(change, value)
+
+    def paint(self, painter, option, widget=None):
+        # The geometry is cached, painting only picks the pen
         pen = QtGui.QPen(QtCore.Qt.black, 2)  # Default color and thickness
 
         # Check if the item is selected or highlighted
@@ -75,27 +117,65 @@ class Edge(QtWidgets.QGraphicsPathItem):
 
         if input_dialog.exec_() == QtWidgets.QDialog.Accepted:
             weight = input_dialog.textValue()
-            self.weight = int(weight) if weight.isdigit() and int(weight) >= 0 else math.inf
-            self._addLabel()
+            weight = int(weight) if weight.isdigit() and int(weight) >= 0 else math.inf
+
+            # The weight lives in the graph's core, which refreshes the label
+            graph = self.scene()
+            if graph is not None and hasattr(graph, "setEdgeWeight"):
+                graph.setEdgeWeight(self, weight)
+
+    def refreshWeight(self):
+        # Shows the core's weight after it changed
+        self._refreshLabel()
 
     def _addLabel(self):
+        # Created once, later changes go through _refreshLabel
         self.weightLabel = QtWidgets.QGraphicsTextItem(self)
         self.weightLabel.setFont(QtGui.QFont("Inter", 11, QtGui.QFont.Bold))
         self.weightLabel.adjustSize()  # Adjust size to fit the text
-       
+
+    def _refreshLabel(self, position: QtCore.QPointF | None = None):
+        # Update the weight label in place, edges that never had a weight
+        # (like the ones of a complement) don't pay for a label item
         if self.weight != math.inf:
+            if self.weightLabel is None:
+                self._addLabel()
             self.weightLabel.setPlainText(str(self.weight))
-            self._updateLabel(self.weightLabel)
+            if position is None:
+                self._updateLabel(self.weightLabel)
+            else:
+                self.weightLabel.setPos(position - self.weightLabel.boundingRect().center())
             self.weightLabel.setVisible(True)
-        else:
+        elif self.weightLabel is not None:
             self.weightLabel.setVisible(False)
 
     def _addArrowHead(self):
+        # Created once, later changes go through _updateArrowStyle and _updateArrowHead
         self.arrow_head = QtWidgets.QGraphicsPolygonItem(self)
         self.arrow_head.setFlag(QtWidgets.QGraphicsPolygonItem.ItemSendsGeometryChanges, True)
-        self._updateArrowHead()
+        self._updateArrowStyle()
+
+    def applyGeometry(self, geometry: tuple | None):
+        # Sets a path, label position and arrowhead computed for many edges at
+        # once by geometry.edgeGeometry, None when the vertices overlap
+        if geometry is None:
+            self.setPath(QtGui.QPainterPath())
+            self.arrow_head.setPolygon(QtGui.QPolygonF())
+            self._refreshLabel(self.start_vertex.getPosition())
+        else:
+            startX, startY, endX, endY, controlX, controlY, labelX, labelY, leftX, leftY, rightX, rightY = geometry
+            end = QtCore.QPointF(endX, endY)
+            path = QtGui.QPainterPath(QtCore.QPointF(startX, startY))
+            if self.isCurve:
+                path.quadTo(QtCore.QPointF(controlX, controlY), end)
+            else:
+                path.lineTo(end)
+            self.setPath(path)
+            self.arrow_head.setPolygon(QtGui.QPolygonF([end, QtCore.QPointF(leftX, leftY), QtCore.QPointF(rightX, rightY)]))
+            self._refreshLabel(QtCore.QPointF(labelX, labelY))
+        self._geometryKey = self.getGeometryKey()
 
-    def _updateArrowHead(self, arrow_size=7):
+    def _updateArrowStyle(self):
         brush = QtGui.QBrush(QtCore.Qt.black)
         pen = QtGui.QPen(QtCore.Qt.black)
         if self.isSelected():
@@ -106,8 +186,13 @@ class Edge(QtWidgets.QGraphicsPathItem):
             pen = QtGui.QPen(QtGui.QColor("#42ffd9"))
         self.arrow_head.setBrush(brush)
         self.arrow_head.setPen(pen)
-    
+
+    def _updateArrowHead(self, arrow_size=7):
         path = self.path()
+        if path.elementCount() == 0:
+            self.arrow_head.setPolygon(QtGui.QPolygonF())
+            return
+
         p1 = path.elementAt(path.elementCount() - 1)  # Last point in the path
         p1 = QtCore.QPointF(p1.x, p1.y)
 
@@ -144,32 +229,6 @@ class Edge(QtWidgets.QGraphicsPathItem):
         self.arrow_head.setPolygon(arrow_head_polygon)
         
     def _updatePath(self):
-        def shape_in_scene_coordinates(item: QtWidgets.QGraphicsItem):
-            local_shape = item.shape()
-            scene_shape = QtGui.QPainterPath()
-
-            # Map each point in the local shape to scene coordinates
-            for i in range(local_shape.elementCount()):
-                element = local_shape.elementAt(i)
-                scene_point = item.mapToScene(QtCore.QPointF(element.x, element.y))
-                if i == 0:
-                    scene_shape.moveTo(scene_point)
-                else:
-                    scene_shape.lineTo(scene_point)
-            return scene_shape
-
-        def find_intersection(path_item, ellipse_item):
-            path_shape_scene = shape_in_scene_coordinates(path_item)
-            ellipse_shape_scene = shape_in_scene_coordinates(ellipse_item)
-
-            # Find intersection between the two shapes in scene coordinates
-            intersection_path = ellipse_shape_scene.intersected(path_shape_scene)
-
-            if not intersection_path.isEmpty():
-                return intersection_path.boundingRect().center()
-            else:
-                return None
-
         def createPath(start, end, control_point):
             path = QtGui.QPainterPath()
             path.moveTo(start)
@@ -179,33 +238,27 @@ class Edge(QtWidgets.QGraphicsPathItem):
                 path.lineTo(end)
             return path
 
-        start = self.start_vertex.getPosition()
-        end = self.end_vertex.getPosition()
-        control_point = self.getControlPoint()
+        start_center = self.start_vertex.getPosition()
+        end_center = self.end_vertex.getPosition()
+        if start_center == end_center:
+            self.setPath(QtGui.QPainterPath())  # Nothing to draw between overlapping vertices
+            return
 
-        path = createPath(start, end, control_point)
-        path_item = QtWidgets.QGraphicsPathItem()
-        path_item.setPath(path)
-
-        # Calculate intersection points with the ellipse boundaries
-        start = find_intersection(path_item, self.start_vertex)
-        end = find_intersection(path_item, self.end_vertex)
-
-        shorten_by = 10
-        if self.isCurve:
-            line_to_start = QtCore.QLineF(control_point, start)
-            line_to_end = QtCore.QLineF(control_point, end)
+        # A curve leaves both endpoints heading towards its control point
+        control_point = self.getControlPoint()
+        start = self._clipToVertex(self.start_vertex, start_center, control_point if self.isCurve else end_center)
+        end = self._clipToVertex(self.end_vertex, end_center, control_point if self.isCurve else start_center)
 
-            start = line_to_start.pointAt(1 - shorten_by / line_to_start.length())
-            end = line_to_end.pointAt(1 - shorten_by / line_to_end.length())
-        else:
-            line = QtCore.QLineF(start, end)
-            start = line.pointAt(shorten_by / line.length())
-            end = line.pointAt(1 - shorten_by / line.length())
-        
         path = createPath(start, end, control_point)
         self.setPath(path)
 
+    def _clipToVertex(self, vertex, center, toward, gap=3):
+        # Analytic clipping against the vertex circle, the point just outside
+        # its border on the way from the center towards the given point
+        line = QtCore.QLineF(center, toward)
+        radius = vertex.rect().width() / 2
+        return line.pointAt((radius + gap) / line.length())
+
     def _updateLabel(self, label: QtWidgets.QGraphicsTextItem):
         label_position = None
         if self.isCurve:
@@ -239,14 +292,17 @@ class Edge(QtWidgets.QGraphicsPathItem):
         
     def setHighlight(self, flag):
         self.isHighlighted = flag
+        self._updateArrowStyle()
 
     def setCurved(self, flag):
         self.isCurve = flag
+        self.updateGeometry()
 
     def update(self):
-        self._addLabel()
-        self._addArrowHead()
-        self._updatePath()
+        # Refresh the existing children instead of adding new ones
+        self._refreshLabel()
+        self._updateArrowStyle()
+        self.updateGeometry()
         super().update()
 
 
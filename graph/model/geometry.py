@@ -0,0 +1,97 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the edges are then computed one by one
+    np = None
+
+CURVE_OFFSET = 60   # Distance of a curve's control point from the middle of the edge
+LABEL_OFFSET = 15   # Distance of a straight edge's weight label from its middle
+VERTEX_GAP = 3  # Space left between an edge end and the vertex border
+ARROW_SIZE = 7
+
+def edgeGeometry(starts, ends, curved, radius: float):
+    # Paths, label anchors and arrowheads of many edges in one pass, matching
+    # what Edge computes for a single edge. The inputs are the (x, y) centers
+    # of the start and end vertices and the curvature flags. Every row is
+    # (start x, start y, end x, end y, control x, control y, label x, label y,
+    # arrow left x, arrow left y, arrow right x, arrow right y), or None when
+    # both vertices share a center.
+    if not starts:
+        return []
+    if np is not None:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _edgeGeometryNumpy(starts, ends, curved, radius)
+    return [_edgeRow(start, end, isCurve, radius) for start, end, isCurve in zip(starts, ends, curved)]
+
+def _edgeRow(start, end, isCurve: bool, radius: float):
+    (x1, y1), (x2, y2) = start, end
+    length = math.hypot(x1 - x2, y1 - y2)
+    if length == 0:
+        return None
+
+    # The control point and label sit on the perpendicular through the middle
+    dx, dy = (x1 - x2) / length, (y1 - y2) / length
+    mx, my = (x1 + x2) / 2, (y1 + y2) / 2
+    cx, cy = mx - dy * CURVE_OFFSET, my + dx * CURVE_OFFSET
+    labelOffset = CURVE_OFFSET if isCurve else LABEL_OFFSET
+    lx, ly = mx - dy * labelOffset, my + dx * labelOffset
+
+    # Clip both ends against the vertex circles, towards the control point
+    # for curves and towards the other end for straight edges
+    towardEnd = (cx, cy) if isCurve else (x2, y2)
+    towardStart = (cx, cy) if isCurve else (x1, y1)
+    sx, sy = _clip(x1, y1, *towardEnd, radius)
+    ex, ey = _clip(x2, y2, *towardStart, radius)
+
+    # The arrowhead follows the last segment of the path
+    px, py = (cx, cy) if isCurve else (sx, sy)
+    tangent = math.hypot(ex - px, ey - py)
+    if tangent == 0:
+        return (sx, sy, ex, ey, cx, cy, lx, ly, ex, ey, ex, ey)
+    ux, uy = (ex - px) / tangent, (ey - py) / tangent
+    return (
+        sx, sy, ex, ey, cx, cy, lx, ly,
+        ex - ARROW_SIZE * ux - ARROW_SIZE * uy, ey - ARROW_SIZE * uy + ARROW_SIZE * ux,
+        ex - ARROW_SIZE * ux + ARROW_SIZE * uy, ey - ARROW_SIZE * uy - ARROW_SIZE * ux,
+    )
+
+def _clip(x: float, y: float, towardX: float, towardY: float, radius: float):
+    length = math.hypot(towardX - x, towardY - y)
+    t = (radius + VERTEX_GAP) / length
+    return x + (towardX - x) * t, y + (towardY - y) * t
+
+def _edgeGeometryNumpy(starts, ends, curved, radius: float):
+    x1, y1 = np.asarray(starts, dtype=np.float64).T
+    x2, y2 = np.asarray(ends, dtype=np.float64).T
+    isCurve = np.asarray(curved, dtype=bool)
+    length = np.hypot(x1 - x2, y1 - y2)
+    isEmpty = length == 0
+    length[isEmpty] = 1     # Placeholder, these rows are dropped at the end
+
+    dx, dy = (x1 - x2) / length, (y1 - y2) / length
+    mx, my = (x1 + x2) / 2, (y1 + y2) / 2
+    cx, cy = mx - dy * CURVE_OFFSET, my + dx * CURVE_OFFSET
+    labelOffset = np.where(isCurve, CURVE_OFFSET, LABEL_OFFSET)
+    lx, ly = mx - dy * labelOffset, my + dx * labelOffset
+
+    def clip(x, y, towardX, towardY):
+        t = (radius + VERTEX_GAP) / np.hypot(towardX - x, towardY - y)
+        return x + (towardX - x) * t, y + (towardY - y) * t
+
+    sx, sy = clip(x1, y1, np.where(isCurve, cx, x2), np.where(isCurve, cy, y2))
+    ex, ey = clip(x2, y2, np.where(isCurve, cx, x1), np.where(isCurve, cy, y1))
+
+    px, py = np.where(isCurve, cx, sx), np.where(isCurve, cy, sy)
+    tangent = np.hypot(ex - px, ey - py)
+    tangent[tangent == 0] = np.inf  # Collapses the arrowhead onto the end point
+    ux, uy = (ex - px) / tangent, (ey - py) / tangent
+    columns = (
+        sx, sy, ex, ey, cx, cy, lx, ly,
+        ex - ARROW_SIZE * ux - ARROW_SIZE * uy, ey - ARROW_SIZE * uy + ARROW_SIZE * ux,
+        ex - ARROW_SIZE * ux + ARROW_SIZE * uy, ey - ARROW_SIZE * uy - ARROW_SIZE * ux,
+    )
+    rows = list(zip(*(column.tolist() for column in columns)))
+    for index in np.flatnonzero(isEmpty).tolist():
+        rows[index] = None
+    return rows
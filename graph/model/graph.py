@@ -1,63 +1,172 @@
 import math
+from collections import OrderedDict
 from typing import List
 from PyQt5 import QtGui, QtWidgets, QtCore
 
 from .vertex import Vertex
 from .edge import Edge
+from .core import GraphModel
+from .solver import SolveTask
+from . import importer, storage
+from .geometry import edgeGeometry, CURVE_OFFSET
 from ..algorithm.djisktra import Djisktra
 from ..algorithm.floyd import FloydWarshall
+from ..algorithm.johnson import Johnson
+from ..algorithm.route import Route
 
 class Graph(QtWidgets.QGraphicsScene):
+    VERTEX_DIAMETER = 30
+    EDGE_ITEM_LIMIT = 10000     # Most edge items made for the part of a large graph in view
+    ALL_PAIRS_ALGORITHMS = ("auto", "floyd", "johnson")
+    SOLVE_CACHE_BYTES = 256 * 2 ** 20   # Rough memory budget of the cached solver results
+
+    solveStarted = QtCore.pyqtSignal()  # A background solve was submitted
+    solveProgress = QtCore.pyqtSignal(int, int)     # Done and total steps of the current solve
+    solveFinished = QtCore.pyqtSignal()     # The current solve's results were applied
+    solveFailed = QtCore.pyqtSignal(str)    # Error message of the current solve
+    edgeChanged = QtCore.pyqtSignal(object, object, object)     # Edge, old weight, new weight
+    edgesHidden = QtCore.pyqtSignal(int)    # Number of edges in view that are too many to draw
+
     def __init__(self):
         super().__init__()
-        self.vertices: List[Vertex] = []  # List of the vertices
+        self.core = GraphModel()    # Qt free model, the items below are only its view
+        self.vertexItems: dict[int, Vertex] = {}    # Vertex items by core vertex id
+        self.edgeItems: dict[tuple[int, int], Edge] = {}    # Edge items by core edge key
+        self._hasHiddenEdges = False    # Some core edges have no item until they come into view
         self.selected_vertices: List[Vertex] = []   # List of the selected vertices
-        self.edges: List[Edge] = []     # List of edges
-        self.adjacencyMatrix: list[list[float]] = []     # Adjacency matrix
         
-        self.djisktra = Djisktra(self.vertices)
-        self.floyd = FloydWarshall(self.vertices)
+        self.djisktra = Djisktra(self.core.vertices, self.core.vertexIndex)
+        self.floyd = FloydWarshall(self.core.vertices)     # All pairs results of either engine
+        self.allPairsAlgorithm = "auto"     # Picked by density unless set from the menu
+        self._allPairsVersion = -1  # Version the all pairs results belong to
+        self.route = Route()
+        self.hasGeometricWeights = False    # Weights follow the distances on the canvas, routes may use A*
+        self._routeStart: Vertex | None = None
+
+        self.isSolving = False  # Flag while a background solve is running
+        self._solveGeneration = 0   # Results of older generations are stale
+        self._solveTask: SolveTask | None = None
+        self._pendingTasks: set[SolveTask] = set()  # Submitted tasks, kept alive until the pool is done with them
+        self._threadPool = QtCore.QThreadPool()
+        self._solveKey: tuple | None = None     # Cache key of the running solve
+
+        # Finished solvers by (algorithm, start id, version), least recently used first
+        self._solveCache: OrderedDict[tuple, tuple[object, int]] = OrderedDict()
+        self._solveCacheBytes = 0
+        self.cacheHits = 0
+        self.cacheMisses = 0
+
+        self._sceneItems: dict[int, QtWidgets.QGraphicsItem] = {}   # Model items in the scene by identity
 
         self.isAddingVertex = False  # Flag to enable adding vertex
         self.isAddingEdge = False    # Flag to enable adding edge
         self.isUsingDjisktra = False  # Flag to enable djisktra algorithm
         self.isUsingFloyd = False     # Flag to enable floyd algorithm
+        self.isUsingRoute = False     # Flag to enable point to point routes
+
+        self.edgeChanged.connect(self._onEdgeChanged)
+
+    @property
+    def version(self):
+        # Bumped on every change to the vertices, edges or weights
+        return self.core.version
 
     def createVertex(self, scene_position: QtCore.QPointF):
-        # Define the diameter of the circle
-        diameter = 30
-        radius = diameter / 2
-        position = QtCore.QPointF(scene_position.x() - radius, scene_position.y() - radius)
-        
-        vertex = Vertex(self.createID(), 0, 0, diameter, diameter)
-        vertex.setPos(position)  # Position
-        self.vertices.append(vertex)
+        record = self.core.addVertex(scene_position.x(), scene_position.y())
+        vertex = self._createVertexItem(record)
+        self._modelChanged()
         return vertex
-    
-    def createAdjMatrix(self):
-        # Terminate the execution if there are no vertices
-        size = len(self.vertices)
-        if size == 0:
-            return
 
-        # Intiallize matrix with zeros
-        self.adjacencyMatrix = [[math.inf for _ in range(size)] for _ in range(size)]  
-
-        # Create a dictionary of index values with the vertex ids as keys
-        idToIndex = {vertex.id: index for index, vertex in enumerate(self.vertices)}
+    def _createVertexItem(self, record):
+        # Item of a core vertex, the core keeps the center and the item its corner
+        radius = self.VERTEX_DIAMETER / 2
+        vertex = Vertex(record.id, 0, 0, self.VERTEX_DIAMETER, self.VERTEX_DIAMETER)
+        vertex.setPos(QtCore.QPointF(record.x - radius, record.y - radius))  # Position
+        self.vertexItems[record.id] = vertex
+        return vertex
 
-        for vertex in self.vertices:
-            for edge in vertex.edges:
-                if vertex == edge.getStart():
-                    indexA = idToIndex[edge.start_vertex.id]
-                    indexB = idToIndex[edge.end_vertex.id]
-                    
-                    if edge.weight != math.inf:
-                        self.adjacencyMatrix[indexA][indexB] = edge.weight
-            
-                    self.adjacencyMatrix[indexA][indexA] = 0
-                    self.adjacencyMatrix[indexB][indexB] = 0               
+    def _createEdgeItem(self, record, isCurve: bool = False, deferGeometry: bool = False):
+        # Item of a core edge, it reads the weight from the record
+        edge = Edge(self.vertexItems[record.start], self.vertexItems[record.end], record, isCurve, deferGeometry)
+        self.edgeItems[record.getKey()] = edge
+        return edge
+
+    def saveGraph(self, path: str):
+        # Binary unless the path ends in .json
+        storage.save(self.core, path)
+
+    def loadGraph(self, path: str, progress=None):
+        # Replaces the graph with the one in the file, saved graphs are loaded
+        # and edge lists, CSV and GraphML files imported. The items are made
+        # once from the filled core. A file that can't be read leaves an empty graph.
+        self.reset()
+        try:
+            if path.endswith(importer.SUFFIXES):
+                importer.load(path, self.core, progress)
+            else:
+                storage.load(path, self.core)
+            edges = self.core.edges     # Repeated edges in the file are found here
+        except Exception:
+            self.reset()
+            raise
+
+        for record in self.core.vertices:
+            self._createVertexItem(record)
+        for record in edges.values():
+            self._createEdgeItem(record, self.core.hasEdge(record.end, record.start), deferGeometry=True)
+        self._modelChanged()
+        self.populateScene()
+        for vertex in self.vertexItems.values():
+            vertex.update()     # Refresh the degree, read from the core once in the scene
+
+    def populateScene(self):
+        # Bulk variant of update for whole graphs. Scene indexing is off while
+        # the items are swapped, the new edges get their geometry in one
+        # vectorized pass from the core's positions, and the BSP tree is
+        # rebuilt once at the end. New edges must already know their curvature.
+        modelItems = self._modelItems()
+
+        self.setItemIndexMethod(QtWidgets.QGraphicsScene.NoIndex)
+        try:
+            # Stale edges leave together, so no opposite edge needs a new curvature
+            for key in [key for key in self._sceneItems if key not in modelItems]:
+                item = self._sceneItems.pop(key)
+                if item.scene() is self:
+                    self.removeItem(item)
+
+            newItems = [item for key, item in modelItems.items() if key not in self._sceneItems]
+            for item in newItems:
+                self._sceneItems[id(item)] = item
+                if item.scene() is not self:
+                    self.addItem(item)
+
+            newEdges = [item for item in newItems if isinstance(item, Edge)]
+            positions = self.core.vertexById
+            starts = [(positions[edge.record.start].x, positions[edge.record.start].y) for edge in newEdges]
+            ends = [(positions[edge.record.end].x, positions[edge.record.end].y) for edge in newEdges]
+            rows = edgeGeometry(starts, ends, [edge.isCurve for edge in newEdges], self.VERTEX_DIAMETER / 2)
+            for edge, row in zip(newEdges, rows):
+                edge.applyGeometry(row)
+        finally:
+            self.setItemIndexMethod(QtWidgets.QGraphicsScene.BspTreeIndex)
+
+        # Imported graphs may reach past the initial canvas
+        self.setSceneRect(self.sceneRect().united(self.itemsBoundingRect()))
+
+    def moveVertex(self, vertex: Vertex):
+        # Called by the vertex after a drag, keeps the core's position current
+        # and refreshes the cached geometry of the connected edges
+        if vertex.id in self.core.vertexById:
+            position = vertex.getPosition()
+            self.core.moveVertex(vertex.id, position.x(), position.y())
+            for key in self.core.incidentEdges(vertex.id):
+                edge = self.edgeItems.get(key)
+                if edge is not None:
+                    edge.updateGeometry()
 
+    def getDegree(self, vertex: Vertex):
+        return self.core.degree(vertex.id) if vertex.id in self.core.vertexById else 0
+    
     def createEdge(self,):
         # If not adding edge, stops the function
         if not self.isAddingEdge:
@@ -75,14 +184,15 @@ class Graph(QtWidgets.QGraphicsScene):
                 else:
                     start = self.selected_vertices.pop()
                     end = vertex
-                    edge = Edge(start, end)
 
-                    if self.hasDuplicate(edge):
+                    if self.hasEdge(start, end):
                         return
                     
-                    self.edges.append(edge) 
-                    start.addEdge(edge)
-                    end.addEdge(edge)
+                    edge = self._createEdgeItem(self.core.addEdge(start.id, end.id))
+                    self._modelChanged()
+                    self.edgeChanged.emit(edge, math.inf, edge.weight)
+                    start.update()  # Refresh the degrees
+                    end.update()
                     self.addItem(edge)
                     self.setCurvedEdge(edge)
                 vertex.setSelected(True) 
@@ -90,93 +200,151 @@ class Graph(QtWidgets.QGraphicsScene):
     def setCurvedEdge(self, edge:Edge):
         start = edge.getStart()
         end = edge.getOpposite(start)
-        opposite_edge = Edge(end, start)
-        if self.hasDuplicate(opposite_edge):
+        opposite_edge = self.getEdge(end, start)
+        if opposite_edge is not None:
             edge.setCurved(True)
-            self.getDuplicate(opposite_edge).setCurved(True)
+            opposite_edge.setCurved(True)
         else:
             edge.setCurved(False) 
 
-    def createID(self):
-        if len(self.vertices) == 0:
-            return 1
-        else:
-            return self.vertices[-1].id + 1
-
     def delete(self):
-        # Delete the selected items from the graph
-        # Iterate from the vertices if the selected item is a vertex
-        for vertex in self.vertices.copy():  # Iterate from a copy
-            if vertex.isSelected():
-                # Remove from the list of vertices
-                self.vertices.remove(vertex) 
-                
-                # Also remove the edges from its neighbor that was connected 
-                # to the vertex
-                for vertex_edge in vertex.edges:
-                    neighbor = vertex_edge.getOpposite(vertex)
-
-                    for neighbor_edge in neighbor.edges.copy():
-                        # Get the opposite of the neighbor, this means that 
-                        # the opposite will most likely be the vertex
-                        neighbor_opposite = neighbor_edge.getOpposite(neighbor)
-
-                        # Check if it is true, 
-                        # then remove the edge in the neighbor's edges
-                        if neighbor_opposite == vertex:
-                            neighbor_edge in neighbor.edges and neighbor.edges.remove(neighbor_edge)
-                            neighbor_edge in self.edges and self.edges.remove(neighbor_edge)
-                            del neighbor_edge   # Deleting the edge to save memory
-            del vertex  # Deleting the vertex to save memory
-
-        # Iterate from the edges if the selected item is an edge
-        for edge in self.edges.copy(): # Iterate from a copy
-            if edge.isSelected():
-                # Remove the edge in both endpoints
-                edge in edge.start_vertex.edges and edge.start_vertex.edges.remove(edge)
-                edge in edge.end_vertex.edges and edge.end_vertex.edges.remove(edge)
-                self.edges.remove(edge)
-                del edge
+        # Delete the selected items in one batched pass. The edges of a deleted
+        # vertex come from the core's incidence sets, so each vertex costs
+        # O(degree), and the items are dropped by their core keys.
+        selected = self.selectedItems()
+        removedVertices = {item.id: item for item in selected if isinstance(item, Vertex)}
+        removedEdges = {item.getKey(): item for item in selected if isinstance(item, Edge)}
+        for id in removedVertices:
+            # Edges that were never in view have no item
+            removedEdges.update((key, self.edgeItems.get(key)) for key in self.core.incidentEdges(id))
+        if not removedVertices and not removedEdges:
+            return
+
+        for key in removedEdges:
+            self.edgeItems.pop(key, None)
+        if removedVertices:
+            # The core takes the edges of deleted vertices along with them
+            for start, end in removedEdges:
+                if start not in removedVertices and end not in removedVertices:
+                    self.core.removeEdge(start, end)
+            for id in removedVertices:
+                del self.vertexItems[id]
+            self.core.removeVertices(removedVertices)
+            self._modelChanged()
+            self._resetPaths()
+        else:
+            # Single edge changes let the all pairs results follow along
+            for (start, end), edge in removedEdges.items():
+                self.core.removeEdge(start, end)
+                self._modelChanged()
+                self.edgeChanged.emit(edge, edge.weight, math.inf)
+
+        # Refresh the degrees of the surviving endpoints
+        affected = {id for key in removedEdges for id in key if id not in removedVertices}
+        for id in affected:
+            self.vertexItems[id].update()
+
+        # Take the items off the scene now rather than on the next update
+        for item in list(removedEdges.values()) + list(removedVertices.values()):
+            if item is not None:
+                self._removeFromScene(item)
+
+    def _resetPaths(self):
+        # The results are indexed by the old vertex list, so they can't be
+        # updated after vertices are removed. All pairs paths are solved again.
+        self.djisktra.reset()
+        self.floyd.reset()
+        self._allPairsVersion = -1
+        if self.isUsingFloyd:
+            self.useFloyd()
 
     def getComplement(self):
-        self.edges.clear()
-
-        for vertex in self.vertices:
-            neighbors = []
-            for edge in vertex.edges:
-                neighbor = edge.getOpposite(vertex)
-                neighbors.append(neighbor)
-            
-            complement_vertices = [v for v in self.vertices if v not in neighbors and v != vertex]
-            vertex.edges.clear()
-
-            for complement_vertex in complement_vertices:
-                complement_edge = Edge(vertex, complement_vertex)
-
-                if not self.hasDuplicate(complement_edge):
-                    self.edges.append(complement_edge)
-                    vertex.addEdge(complement_edge)
-                else:
-                    vertex.addEdge(self.getDuplicate(complement_edge))
-    
-    def getDuplicate(self, new_edge: Edge):
-        for edge in self.edges:
-            if new_edge == edge:
-                return edge 
+        # The core computes the complement. A sparse graph has a dense
+        # complement with far more edges than the scene can hold as items, so
+        # the items are only made by showEdgesIn for the edges in view. The
+        # old items leave the scene and the degrees are refreshed once.
+        self.core.complement()
+        self.edgeItems.clear()
+        self._hasHiddenEdges = True
+        self._modelChanged()
+        self.populateScene()
+        for vertex in self.vertexItems.values():
+            vertex.update()
+
+    def showEdgesIn(self, rect: QtCore.QRectF):
+        # Makes the missing items of the edges whose bounds meet the rect,
+        # with the margin a curve bulges out by. When that would take more
+        # than EDGE_ITEM_LIMIT items none are made, the scan stops there and
+        # edgesHidden reports it.
+        if not self._hasHiddenEdges:
+            return
+        margin = CURVE_OFFSET + self.VERTEX_DIAMETER / 2
+        left, top = rect.left() - margin, rect.top() - margin
+        right, bottom = rect.right() + margin, rect.bottom() + margin
+
+        positions, items = self.core.vertexById, self.edgeItems
+        records = []
+        for key, record in self.core.edges.items():
+            if key in items:
+                continue
+            start, end = positions[record.start], positions[record.end]
+            if (min(start.x, end.x) <= right and max(start.x, end.x) >= left
+                    and min(start.y, end.y) <= bottom and max(start.y, end.y) >= top):
+                records.append(record)
+                if len(records) + len(items) > self.EDGE_ITEM_LIMIT:
+                    self.edgesHidden.emit(self.core.edgeCount - len(items))
+                    return
+
+        for record in records:
+            self._createEdgeItem(record, self.core.hasEdge(record.end, record.start), deferGeometry=True)
+        self._hasHiddenEdges = len(items) < self.core.edgeCount
+        if records:
+            self.populateScene()
+
+    def setEdgeWeight(self, edge: Edge, weight: float):
+        if not self.core.hasEdge(*edge.getKey()):
+            return
+        oldWeight = edge.weight
+        self.core.setWeight(*edge.getKey(), weight)
+        edge.refreshWeight()
+        self._modelChanged()
+        self.edgeChanged.emit(edge, oldWeight, weight)
+
+    def indexOf(self, vertex: Vertex):
+        # Position of the vertex in the core's vertex order
+        return self.core.vertexIndex[vertex.id]
+
+    def getVertex(self, id: int):
+        return self.vertexItems.get(id)
+
+    def getItemCount(self):
+        # Debug counter of the live items in the scene, children included
+        return len(self.items())
 
-    def hasDuplicate(self, new_edge: Edge):
-        for edge in self.edges:
-            if new_edge == edge:
-                return True
-        return False
+    def _modelChanged(self):
+        # Results of a solve started before this change would be stale
+        self.cancelSolve()
+
+    def getEdge(self, start: Vertex, end: Vertex):
+        # Constant time lookup of the edge from start to end
+        return self.edgeItems.get((start.id, end.id))
+
+    def hasEdge(self, start: Vertex, end: Vertex):
+        return self.core.hasEdge(start.id, end.id)
 
     def reset(self):
-        self.vertices.clear()
-        self.adjacencyMatrix.clear()
-        self.edges.clear()
+        self.core.clear()
+        self.vertexItems.clear()
+        self.edgeItems.clear()
+        self._hasHiddenEdges = False
+        self._modelChanged()
+        self._solveCache.clear()
+        self._solveCacheBytes = 0
         self.isAddingEdge = False
         self.isAddingVertex = False
         self.isUsingDjisktra = False
+        self.isUsingRoute = False
+        self._routeStart = None
 
     def showPath(self, start: Vertex | None, goal: Vertex | None):
         # Unhighlight all items first
@@ -198,21 +366,26 @@ class Graph(QtWidgets.QGraphicsScene):
                 paths = self.floyd.paths
             elif self.isUsingDjisktra:
                 paths = self.djisktra.paths
+            elif self.isUsingRoute:
+                # Only the route between the two vertices is searched
+                route = self.findRoute(start, goal)
+                if not route:
+                    raise KeyError(goal.id)
+                paths = {self.indexOf(goal): route}
 
             if not paths:
                 return
 
             # Retrieve path from start to goal
             if self.isUsingFloyd:
-                path = list(paths[(self.vertices.index(start), self.vertices.index(goal))])
-            elif self.isUsingDjisktra:
-                path = list(paths[self.vertices.index(goal)])
+                path = list(paths[(self.indexOf(start), self.indexOf(goal))])
+            elif self.isUsingDjisktra or self.isUsingRoute:
+                path = list(paths[self.indexOf(goal)])
 
             # Highlight edges along the path
-            while len(path) > 1:
-                start = self.vertices[path.pop(0)]
-                end = self.vertices[path[0]]
-                edge = self.getDuplicate(Edge(start, end))
+            ids = [self.core.vertices[index].id for index in path]
+            for key in zip(ids, ids[1:]):
+                edge = self.edgeItems.get(key)
                 if edge is not None:
                     edge.setHighlight(True)
         except Exception as e:
@@ -234,35 +407,234 @@ class Graph(QtWidgets.QGraphicsScene):
             item.setSelected(False)
 
     def setHighlightItems(self, flag: bool):
-        for edge in self.edges:
+        for edge in self.edgeItems.values():
             edge.setHighlight(flag)
-        for vertex in self.vertices:
+        for vertex in self.vertexItems.values():
             vertex.setHighlight(flag, None)
 
     def useDjisktra(self):
         if self.isUsingDjisktra:
-            for item in self.selectedItems():
-                if isinstance(item, Vertex):
-                    self.djisktra.findPath(item, self.adjacencyMatrix)
+            starts = [item for item in self.selectedItems() if isinstance(item, Vertex)]
+            if not starts:
+                return
+
+            # Each solve replaced the previous one, so only the last start counts
+            start = starts[-1]
+            key = ("djisktra", start.id, self.version)
+            if self._useCachedSolve(key):
+                return
+
+            adjacency = self.core.getAdjacency()
+            djisktra = Djisktra(list(self.core.vertices), dict(self.core.vertexIndex))
+
+            def solve(progress):
+                djisktra.findPath(start, adjacency, progress)
+                return djisktra
+            self._submitSolve(solve, key)
 
     def useFloyd(self):
         if self.isUsingFloyd:
-            self.floyd.findPath(self.adjacencyMatrix)
+            algorithm = self.getAllPairsAlgorithm()
+            key = (algorithm, None, self.version)
+            if self._useCachedSolve(key):
+                return
 
-    def update(self):
-        # Clear the view first
-        for item in self.items():
-            self.removeItem(item)
+            adjacency = self.core.getAdjacency()
+            if algorithm == "johnson":
+                floyd = Johnson(list(self.core.vertices))
+            else:
+                floyd = FloydWarshall(list(self.core.vertices))
+
+            def solve(progress):
+                floyd.findPath(adjacency, progress)
+                return floyd
+            self._submitSolve(solve, key)
+
+    def useRoute(self):
+        # Click a start and then a goal to show the route between them
+        if not self.isUsingRoute:
+            self._routeStart = None
+            return
+        selected = [item for item in self.selectedItems() if isinstance(item, Vertex)]
+        if not selected:
+            return
 
-        # Add vertices to the scene
-        for vertex in self.vertices:
-            self.addItem(vertex)
-            vertex.update()
+        vertex = selected[-1]
+        if self._routeStart is None or self._routeStart is vertex:
+            self._routeStart = vertex
+        else:
+            start, self._routeStart = self._routeStart, None
+            self.showPath(start, vertex)
+
+    def findRoute(self, start: Vertex, goal: Vertex):
+        # Point to point query, returns the vertex indices of the shortest
+        # route or an empty list. A* needs the weights to be geometric.
+        self.route = self.core.findRoute(start.id, goal.id, self.hasGeometricWeights)
+        return self.route.path
+
+    def getAllPairsAlgorithm(self):
+        # The menu choice, or else the engine the core estimates to be cheaper
+        if self.allPairsAlgorithm != "auto":
+            return self.allPairsAlgorithm
+        return self.core.chooseAllPairs()
+
+    def cancelSolve(self):
+        if self._solveTask is not None:
+            self._solveTask.cancel()
+            self._solveTask = None
+        self._solveKey = None
+        self._solveGeneration += 1
+        self.isSolving = False
+
+    def waitForSolve(self):
+        # Blocks until the background solves are done and their results applied
+        self._threadPool.waitForDone()
+        QtCore.QCoreApplication.processEvents()
+
+    def _submitSolve(self, solve, key: tuple | None = None):
+        # The solve only gets snapshots, the live lists may change while it runs
+        self.cancelSolve()
+        self._solveKey = key
+        task = SolveTask(self._solveGeneration, solve)
+        task.signals.progress.connect(self._onSolveProgress)
+        task.signals.finished.connect(self._onSolveFinished)
+        task.signals.failed.connect(self._onSolveFailed)
+        task.signals.done.connect(self._pendingTasks.discard)
+
+        self._pendingTasks.add(task)
+        self._solveTask = task
+        self.isSolving = True
+        self.solveStarted.emit()
+        self._threadPool.start(task)
+
+    def _onSolveProgress(self, generation: int, done: int, total: int):
+        if generation == self._solveGeneration:
+            self.solveProgress.emit(done, total)
+
+    def _onSolveFinished(self, generation: int, solver):
+        if generation != self._solveGeneration:
+            return  # Drop the results of a stale solve
+
+        if self._solveKey is not None:
+            self._cacheSolve(self._solveKey, solver)
+        self._applySolve(solver)
+
+    def _applySolve(self, solver):
+        self._solveTask = None
+        self._solveKey = None
+        self.isSolving = False
+        if isinstance(solver, Djisktra):
+            self.djisktra.startVertex = solver.startVertex
+            self.djisktra.paths = solver.paths
+            self.djisktra.distances = solver.distances
+        else:
+            self.floyd.setResults(solver.distances, solver.predecessors)
+            self._allPairsVersion = self.version  # Any change since would have cancelled the solve
+        self.solveFinished.emit()
+
+    def _onEdgeChanged(self, edge: Edge, oldWeight: float, newWeight: float):
+        # Keep the all pairs results in step with a single edge change
+        if not self.isUsingFloyd:
+            return
+
+        # Only results of the version right before this change can be updated
+        if self._allPairsVersion != self.version - 1 or not self.floyd.paths:
+            self.useFloyd()
+        elif oldWeight == newWeight or self.floyd.updateEdge(
+            self.indexOf(edge.start_vertex), self.indexOf(edge.end_vertex), oldWeight, newWeight, self.core.getAdjacency()
+        ):
+            self._allPairsVersion = self.version
+            # The updated results stand in for a solve of this version
+            floyd = FloydWarshall(list(self.core.vertices))
+            floyd.setResults(self.floyd.distances, self.floyd.predecessors)
+            self._cacheSolve((self.getAllPairsAlgorithm(), None, self.version), floyd)
+            self.solveFinished.emit()
+        else:
+            self.useFloyd()
+
+    def _useCachedSolve(self, key: tuple):
+        # Applies the results of an earlier solve with the same key, if any
+        entry = self._solveCache.get(key)
+        if entry is None:
+            self.cacheMisses += 1
+            return False
+
+        self.cacheHits += 1
+        self._solveCache.move_to_end(key)
+        self.cancelSolve()
+        self._applySolve(entry[0])
+        return True
+
+    def _cacheSolve(self, key: tuple, solver):
+        # Results of older versions can never be looked up again
+        for staleKey in [staleKey for staleKey in self._solveCache if staleKey[2] != self.version]:
+            self._solveCacheBytes -= self._solveCache.pop(staleKey)[1]
+
+        if key in self._solveCache:
+            self._solveCacheBytes -= self._solveCache.pop(key)[1]
+        size = self._estimateSolveSize(solver)
+        self._solveCache[key] = (solver, size)
+        self._solveCacheBytes += size
+
+        # Evict the least recently used results, but always keep the newest
+        while self._solveCacheBytes > self.SOLVE_CACHE_BYTES and len(self._solveCache) > 1:
+            self._solveCacheBytes -= self._solveCache.popitem(last=False)[1][1]
+
+    @staticmethod
+    def _estimateSolveSize(solver):
+        # About 24 bytes per distance and predecessor, a row for single source
+        # solves and a full matrix for all pairs solves
+        n = len(solver.distances)
+        return 24 * (n if isinstance(solver, Djisktra) else n * n)
+
+    def _onSolveFailed(self, generation: int, message: str):
+        if generation == self._solveGeneration:
+            self._solveTask = None
+            self.isSolving = False
+            self.solveFailed.emit(message)
+            self.solveFinished.emit()   # Lets the panels leave the computing state
+
+    def update(self):
+        # Reconcile the scene with the model instead of re-adding every item,
+        # scene items are tracked by identity since equal edges can differ
+        modelItems = self._modelItems()
+
+        # Remove the items that were deleted from the model
+        for key in [key for key in self._sceneItems if key not in modelItems]:
+            self._removeFromScene(self._sceneItems[key])
+
+        # Add the new vertices to the scene
+        for vertex in self.vertexItems.values():
+            if id(vertex) not in self._sceneItems:
+                self._sceneItems[id(vertex)] = vertex
+                if vertex.scene() is not self:
+                    self.addItem(vertex)
+                vertex.update()
                 
-        # Add edges to the scene
-        for edge in self.edges:
-            self.addItem(edge)
-            self.setCurvedEdge(edge)
-            edge.update()
+        # Add the new edges to the scene
+        for edge in self.edgeItems.values():
+            if id(edge) not in self._sceneItems:
+                self._sceneItems[id(edge)] = edge
+                if edge.scene() is not self:
+                    self.addItem(edge)
+                self.setCurvedEdge(edge)
+
+        # Edge geometry follows vertex moves and curvature changes on its own
+        super().update()
+
+    def _modelItems(self):
+        # The items of the core's vertices and edges by identity
+        modelItems = {id(vertex): vertex for vertex in self.vertexItems.values()}
+        modelItems.update((id(edge), edge) for edge in self.edgeItems.values())
+        return modelItems
+
+    def _removeFromScene(self, item: QtWidgets.QGraphicsItem):
+        self._sceneItems.pop(id(item), None)
+        if item.scene() is self:
+            self.removeItem(item)
 
-        super().update()
\ No newline at end of file
+        # The opposite of a removed edge may no longer need to curve
+        if isinstance(item, Edge):
+            opposite = self.getEdge(item.end_vertex, item.start_vertex)
+            if opposite is not None:
+                self.setCurvedEdge(opposite)
@@ -0,0 +1,279 @@
+import csv
+import math
+import os
+import xml.etree.ElementTree as ElementTree
+from array import array
+from typing import Callable
+
+from .core import GraphModel
+
+EDGE_LIST_SUFFIXES = (".edgelist", ".edges", ".txt")
+CSV_SUFFIXES = (".csv", ".tsv")
+GRAPHML_SUFFIXES = (".graphml",)
+SUFFIXES = EDGE_LIST_SUFFIXES + CSV_SUFFIXES + GRAPHML_SUFFIXES
+
+CHUNK_BYTES = 2 ** 20   # Lines are read about a mebibyte at a time
+GRID_SPACING = 60   # Distance between the vertices placed on a grid
+
+# Header names of the endpoint and weight columns in CSV files
+CSV_START_COLUMNS = ("source", "start", "from", "src")
+CSV_END_COLUMNS = ("target", "end", "to", "dst")
+CSV_WEIGHT_COLUMNS = ("weight", "cost", "distance")
+
+class GraphBuilder:
+    # Collects the vertices and edges of an import and inserts them into a
+    # model in one commit, so the model's maps, sets and version are only
+    # touched once. Integer labels keep their value as the vertex id, other
+    # labels are numbered with the free ids at commit, so the ids don't
+    # depend on the order of the lines. A repeated edge keeps its last
+    # weight and self loops are dropped since they never shorten a path.
+
+    def __init__(self) -> None:
+        self.ids = array("q")   # 0 for non-integer labels until the commit
+        self.xs = array("d")    # NaN until a position is known
+        self.ys = array("d")
+        self.labels: dict = {}  # Position in the columns by label as read
+        self.edges: dict[tuple[int, int], float] = {}  # Weight by (start position, end position)
+        self._integerLabels: dict[int, int] = {}   # Position by integer label, so "01" and "1" are one vertex
+        self._namedPositions: list[int] = []    # Positions of the non-integer labels
+
+    def __len__(self):
+        return len(self.ids)
+
+    def vertex(self, label, x: float = math.nan, y: float = math.nan):
+        # Returns the position of the vertex in the columns
+        index = self.labels.get(label)
+        if index is None:
+            index = self._addLabel(label)
+
+        # A vertex first seen as an edge end may get its position later
+        if not math.isnan(x) and not math.isnan(y):
+            self.xs[index], self.ys[index] = x, y
+        return index
+
+    def edge(self, start, end, weight: float = 1):
+        startIndex, endIndex = self.vertex(start), self.vertex(end)
+        if startIndex != endIndex:
+            self.edges[(startIndex, endIndex)] = weight
+
+    def commit(self, model: GraphModel):
+        # Vertices without a position are laid out on a grid, then everything
+        # goes in with one bulk insert of vertices and one of edges
+        self._numberNamed()
+        self._layoutMissing()
+        ids = self.ids
+        model.addVertices(ids, self.xs, self.ys)
+        model.addEdges((ids[start] for start, _ in self.edges), (ids[end] for _, end in self.edges), self.edges.values())
+        return model
+
+    def _addLabel(self, label):
+        try:
+            id = int(label)
+        except ValueError:
+            id = None
+        else:
+            index = self._integerLabels.get(id)
+            if index is not None:
+                self.labels[label] = index
+                return index
+
+        index = len(self.ids)
+        self.labels[label] = index
+        self.ids.append(id if id is not None else 0)
+        self.xs.append(math.nan)
+        self.ys.append(math.nan)
+        if id is None:
+            self._namedPositions.append(index)
+        else:
+            self._integerLabels[id] = index
+        return index
+
+    def _numberNamed(self):
+        # The lowest ids no integer label uses, in the order the labels appeared
+        nextId = 1
+        for index in self._namedPositions:
+            while nextId in self._integerLabels:
+                nextId += 1
+            self.ids[index] = nextId
+            nextId += 1
+
+    def _layoutMissing(self):
+        columns = max(1, math.ceil(math.sqrt(len(self.ids))))
+        for index in range(len(self.ids)):
+            if math.isnan(self.xs[index]) or math.isnan(self.ys[index]):
+                row, column = divmod(index, columns)
+                self.xs[index] = GRID_SPACING * (column + 1)
+                self.ys[index] = GRID_SPACING * (row + 1)
+
+
+def load(path: str, model: GraphModel | None = None, progress: Callable[[int, int], None] | None = None):
+    # Imports the file into the given model after clearing it, or into a new
+    # one. The format follows the extension, edge lists are the fallback.
+    # The progress callback gets the bytes read and the file size per chunk.
+    if path.endswith(GRAPHML_SUFFIXES):
+        builder = readGraphml(path, progress)
+    elif path.endswith(CSV_SUFFIXES):
+        builder = readCsv(path, progress)
+    else:
+        builder = readEdgeList(path, progress)
+
+    if model is None:
+        model = GraphModel()
+    else:
+        model.clear()
+    return builder.commit(model)
+
+def readEdgeList(path: str, progress: Callable[[int, int], None] | None = None):
+    # Whitespace or comma separated "start end [weight]" lines, '#' starts a
+    # comment and edges without a weight get 1
+    builder = GraphBuilder()
+    number = 0
+    for lines in _readChunks(path, progress):
+        for line in lines:
+            number += 1
+            fields = line.split(b"#", 1)[0].replace(b",", b" ").split()
+            if not fields:
+                continue
+            if len(fields) not in (2, 3):
+                raise ValueError(f"{path}:{number}: Expected 'start end [weight]'.")
+            try:
+                weight = parseWeight(fields[2]) if len(fields) == 3 else 1
+            except ValueError:
+                raise ValueError(f"{path}:{number}: Invalid weight.") from None
+            builder.edge(fields[0].decode(), fields[1].decode(), weight)
+    return builder
+
+def readCsv(path: str, progress: Callable[[int, int], None] | None = None):
+    # One edge per row. A header naming the source and target columns is
+    # used when present, otherwise the first three columns are start, end
+    # and the optional weight.
+    builder = GraphBuilder()
+    dialect = None
+    columns = (0, 1, 2)
+    number = 0
+    for lines in _readChunks(path, progress):
+        text = [line.decode() for line in lines]
+        if dialect is None:
+            dialect = _sniffDialect(path, text)
+            rows = csv.reader(text, dialect)
+            columns = _headerColumns(next(rows, []))
+            if columns is None:
+                columns = (0, 1, 2)
+                rows = csv.reader(text, dialect)    # The first row is an edge
+            else:
+                number += 1
+        else:
+            rows = csv.reader(text, dialect)
+
+        startColumn, endColumn, weightColumn = columns
+        for row in rows:
+            number += 1
+            if not row or not any(row):
+                continue
+            try:
+                start, end = row[startColumn].strip(), row[endColumn].strip()
+                hasWeight = weightColumn is not None and weightColumn < len(row) and row[weightColumn].strip()
+                weight = parseWeight(row[weightColumn]) if hasWeight else 1
+            except (IndexError, ValueError):
+                raise ValueError(f"{path}:{number}: Expected a start, an end and an optional weight.") from None
+            builder.edge(start, end, weight)
+    return builder
+
+def readGraphml(path: str, progress: Callable[[int, int], None] | None = None):
+    # Streams the elements with iterparse and clears each node and edge once
+    # it is read. Weights come from the edge data named "weight" and
+    # positions from node data named "x" and "y". Undirected edges become a
+    # pair of opposite edges.
+    builder = GraphBuilder()
+    keys: dict[str, str] = {}   # Attribute name by key id
+    defaults: dict[str, str] = {}   # Default value by attribute name, for edges
+    isDirected = False
+    size = os.path.getsize(path)
+    count = 0
+
+    with open(path, "rb") as file:
+        for event, element in ElementTree.iterparse(file, events=("start", "end")):
+            tag = element.tag.rsplit("}", 1)[-1]
+            if event == "start":
+                if tag == "graph":
+                    isDirected = element.get("edgedefault", "directed") == "directed"
+                continue
+
+            if tag == "key":
+                keys[element.get("id")] = element.get("attr.name", element.get("id"))
+                default = next((child.text for child in element if child.tag.rsplit("}", 1)[-1] == "default"), None)
+                if default is not None and element.get("for") in ("edge", "all"):
+                    defaults[keys[element.get("id")]] = default
+            elif tag == "node":
+                data = _elementData(element, keys)
+                builder.vertex(element.get("id"), _parsePosition(data.get("x")), _parsePosition(data.get("y")))
+                element.clear()
+            elif tag == "edge":
+                data = _elementData(element, keys)
+                weight = data.get("weight", defaults.get("weight"))
+                weight = parseWeight(weight) if weight not in (None, "") else 1
+                start, end = element.get("source"), element.get("target")
+                builder.edge(start, end, weight)
+                directed = element.get("directed")
+                if (directed == "false") or (directed is None and not isDirected):
+                    builder.edge(end, start, weight)
+                element.clear()
+            else:
+                continue
+
+            count += 1
+            if progress is not None and count % 65536 == 0:
+                progress(file.tell(), size)
+
+    if progress is not None:
+        progress(size, size)
+    return builder
+
+def parseWeight(text):
+    # Integer weights keep the adjacency in integer arrays
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+def _readChunks(path: str, progress: Callable[[int, int], None] | None):
+    # Lists of complete lines, about CHUNK_BYTES at a time
+    size = os.path.getsize(path)
+    with open(path, "rb") as file:
+        while True:
+            lines = file.readlines(CHUNK_BYTES)
+            if not lines:
+                break
+            yield lines
+            if progress is not None:
+                progress(file.tell(), size)
+
+def _sniffDialect(path: str, lines: list[str]):
+    if path.endswith(".tsv"):
+        return csv.excel_tab
+    try:
+        return csv.Sniffer().sniff("".join(lines[:20]), delimiters=",;\t")
+    except csv.Error:
+        return csv.excel
+
+def _headerColumns(header: list[str]):
+    # Positions of the start, end and weight columns, None without a header
+    names = [name.strip().lower() for name in header]
+    start = next((names.index(name) for name in CSV_START_COLUMNS if name in names), None)
+    end = next((names.index(name) for name in CSV_END_COLUMNS if name in names), None)
+    if start is None or end is None:
+        return None
+    weight = next((names.index(name) for name in CSV_WEIGHT_COLUMNS if name in names), None)
+    return start, end, weight
+
+def _elementData(element, keys: dict[str, str]):
+    return {
+        keys.get(child.get("key"), child.get("key")): (child.text or "").strip()
+        for child in element if child.tag.rsplit("}", 1)[-1] == "data"
+    }
+
+def _parsePosition(text: str | None):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return math.nan
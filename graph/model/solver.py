@@ -0,0 +1,50 @@
+from typing import Callable
+from PyQt5 import QtCore
+
+class SolveCancelled(Exception):
+    # Raised inside a running solve once its task has been cancelled
+    pass
+
+
+class SolverSignals(QtCore.QObject):
+    # QRunnable isn't a QObject, so the task reports through this helper.
+    # Every signal carries the generation of the solve it belongs to.
+    progress = QtCore.pyqtSignal(int, int, int)     # generation, done, total
+    finished = QtCore.pyqtSignal(int, object)       # generation, solver with the results
+    failed = QtCore.pyqtSignal(int, str)            # generation, error message
+    done = QtCore.pyqtSignal(object)    # The task, sent last whether it finished, failed or was cancelled
+
+
+class SolveTask(QtCore.QRunnable):
+    # Runs one shortest path solve on a worker thread. The solve callable
+    # only sees an immutable snapshot of the graph and receives a progress
+    # callback that stops it once the task is cancelled.
+
+    def __init__(self, generation: int, solve: Callable) -> None:
+        super().__init__()
+        self.setAutoDelete(False)   # The graph keeps the task alive until it is done
+        self.generation = generation
+        self.solve = solve
+        self.isCancelled = False
+        self.signals = SolverSignals()
+
+    def cancel(self):
+        self.isCancelled = True
+
+    def run(self):
+        try:
+            solver = self.solve(self._reportProgress)
+        except SolveCancelled:
+            pass
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
+        else:
+            if not self.isCancelled:
+                self.signals.finished.emit(self.generation, solver)
+        finally:
+            self.signals.done.emit(self)
+
+    def _reportProgress(self, done: int, total: int):
+        if self.isCancelled:
+            raise SolveCancelled()
+        self.signals.progress.emit(self.generation, done, total)
@@ -0,0 +1,144 @@
+import json
+import math
+import mmap
+import struct
+import sys
+from array import array
+
+from .core import GraphModel
+
+# Binary layout, all little endian and 8 byte aligned:
+#   header    magic, format version, flags, vertex count, edge count
+#   vertices  ids (int64), then x and y (float64)
+#   edges     start ids and end ids (int64), then weights (int64 or float64),
+#             infinite int64 weights are stored as INFINITE_WEIGHT
+MAGIC = b"GRAPHBIN"
+VERSION = 1
+HEADER = struct.Struct("<8sHHxxxxqq")
+INTEGER_WEIGHTS = 0x1   # Flag set when every weight is an integer or infinite
+INFINITE_WEIGHT = 2 ** 63 - 1   # Stands for math.inf in an integer weight section
+
+BINARY_SUFFIX = ".graph"
+JSON_SUFFIX = ".json"
+
+def save(model: GraphModel, path: str):
+    # The format follows the extension, JSON for .json and binary otherwise
+    if path.endswith(JSON_SUFFIX):
+        saveJson(model, path)
+    else:
+        saveBinary(model, path)
+
+def load(path: str, model: GraphModel | None = None):
+    # Loads into the given model after clearing it, or into a new one
+    if path.endswith(JSON_SUFFIX):
+        return loadJson(path, model)
+    return loadBinary(path, model)
+
+def saveBinary(model: GraphModel, path: str):
+    # Edges still in their loaded columns are written without making records
+    starts, ends, weights = model.getEdgeColumns()
+    if isinstance(weights, array):
+        isIntegral = weights.typecode == "q"
+    else:
+        isIntegral = all(isinstance(weight, int) or weight == math.inf for weight in weights)
+    sections = (
+        array("q", (vertex.id for vertex in model.vertices)),
+        array("d", (vertex.x for vertex in model.vertices)),
+        array("d", (vertex.y for vertex in model.vertices)),
+        array("q", starts),
+        array("q", ends),
+        array("q", (INFINITE_WEIGHT if weight == math.inf else weight for weight in weights))
+        if isIntegral else array("d", weights),
+    )
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, INTEGER_WEIGHTS if isIntegral else 0, len(model.vertices), len(starts)))
+        for section in sections:
+            if sys.byteorder != "little":
+                section.byteswap()
+            section.tofile(file)
+
+def loadBinary(path: str, model: GraphModel | None = None):
+    # The sections are copied out of the memory mapped file as typed arrays,
+    # so nothing is parsed per element. The edges stay in those columns
+    # until the model needs its edge records.
+    model = _emptyModel(model)
+    with open(path, "rb") as file:
+        if not file.seek(0, 2):
+            raise ValueError(f"{path} is not a graph file.")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            with memoryview(buffer) as view:
+                _fill(model, view, path)
+    return model
+
+def _fill(model: GraphModel, view: memoryview, path: str):
+    if len(view) < HEADER.size:
+        raise ValueError(f"{path} is not a graph file.")
+    magic, version, flags, n, m = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a graph file.")
+    if version != VERSION:
+        raise ValueError(f"{path} has unsupported format version {version}.")
+    if len(view) != HEADER.size + 8 * (3 * n + 3 * m):
+        raise ValueError(f"{path} is truncated.")
+
+    def section(index: int, count: int, typecode: str):
+        # Sections are counted in 8 byte elements from the end of the header
+        begin = HEADER.size + 8 * index
+        values = array(typecode)
+        with view[begin:begin + 8 * count] as part:
+            values.frombytes(part)
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values
+
+    ids, xs, ys = section(0, n, "q"), section(n, n, "d"), section(2 * n, n, "d")
+    starts, ends = section(3 * n, m, "q"), section(3 * n + m, m, "q")
+    weights = section(3 * n + 2 * m, m, "q" if flags & INTEGER_WEIGHTS else "d")
+    model.addVertices(ids, xs, ys)
+    if flags & INTEGER_WEIGHTS and INFINITE_WEIGHT in weights:
+        # Integers stay integers, only the sentinels become math.inf
+        weights = [math.inf if weight == INFINITE_WEIGHT else weight for weight in weights]
+    model.addEdges(starts, ends, weights)
+
+def saveJson(model: GraphModel, path: str):
+    # Readable variant for small graphs, infinite weights are written as null
+    data = {
+        "format": "graph",
+        "version": VERSION,
+        "vertices": [{"id": vertex.id, "x": vertex.x, "y": vertex.y} for vertex in model.vertices],
+        "edges": [
+            {"start": edge.start, "end": edge.end, "weight": None if edge.weight == math.inf else edge.weight}
+            for edge in model.edges.values()
+        ],
+    }
+    with open(path, "w") as file:
+        json.dump(data, file, indent=2)
+
+def loadJson(path: str, model: GraphModel | None = None):
+    model = _emptyModel(model)
+    with open(path, "r") as file:
+        data = json.load(file)
+    if not isinstance(data, dict) or data.get("format") != "graph":
+        raise ValueError(f"{path} is not a graph file.")
+    if data.get("version") != VERSION:
+        raise ValueError(f"{path} has unsupported format version {data.get('version')}.")
+
+    vertices, edges = data["vertices"], data["edges"]
+    model.addVertices(
+        [vertex["id"] for vertex in vertices],
+        [vertex.get("x", 0.0) for vertex in vertices],
+        [vertex.get("y", 0.0) for vertex in vertices],
+    )
+    model.addEdges(
+        [edge["start"] for edge in edges],
+        [edge["end"] for edge in edges],
+        [math.inf if edge.get("weight") is None else edge["weight"] for edge in edges],
+    )
+    return model
+
+def _emptyModel(model: GraphModel | None):
+    if model is None:
+        return GraphModel()
+    model.clear()
+    return model
@@ -1,12 +1,9 @@
-from typing import List
 from PyQt5.QtWidgets import QGraphicsEllipseItem, QGraphicsTextItem
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QPen, QColor, QBrush
 
 class Vertex(QGraphicsEllipseItem):
     def __init__(self, id, x, y, width, height):
-        from .edge import Edge
-        self.edges: List[Edge] = []  # Stores the edges of this vertex
         self.is_moving = False  # Flag to track dragging state
         self.id = id  # Id for the label
         self.isHighlighted = False
@@ -18,12 +15,12 @@ class Vertex(QGraphicsEllipseItem):
         self.setFlag(QGraphicsEllipseItem.ItemIsSelectable, True)  # Allow the item to be selectable
         self.setFlag(QGraphicsEllipseItem.ItemSendsGeometryChanges, True)  # Notify of position changes
         self.setCursor(Qt.PointingHandCursor)  # Set cursor shape when hovering over the item
-        self.setToolTip(f"Degree: {str(len(self.edges))}")  # Set the degree of this vertex as tooltip
+        self.setToolTip("Degree: 0")  # The graph's core has the degree once the vertex is in a scene
         
         self.addLabel()     # Creates a text label inside the vertex
 
     def addLabel(self):
-        # Create a QGraphicsTextItem for the label
+        # Create a QGraphicsTextItem for the label, only once per vertex
         self.label = QGraphicsTextItem(str(self.id), self)
         font = QFont("Inter", 11, QFont.Bold)  # Set the font and size
         self.label.setFont(font)
@@ -35,15 +32,18 @@ class Vertex(QGraphicsEllipseItem):
         y = rect.height() / 2 - text_rect.height() / 2
         self.label.setPos(x, y)
     
+    def itemChange(self, change, value):
+        # The graph moves the core's vertex and refreshes the connected edges
+        if change == QGraphicsEllipseItem.ItemPositionHasChanged:
+            graph = self.scene()
+            if graph is not None and hasattr(graph, "moveVertex"):
+                graph.moveVertex(self)
+        return super().itemChange(change, value)
+
     def getPosition(self):
         # Gets the position of the vertex in the scene
         return self.mapToScene(self.boundingRect().center())
     
-    def addEdge(self, edge):
-        # Add the new edge to the list of edges
-        self.edges.append(edge)
-        self.update() # Update the degree of the vertex
-
     def setHighlight(self, flag, colorIndex: int | None):
         colors = [QColor("#42ffd9"), QColor("#FF6E64")]
         self.isHighlighted = flag
@@ -51,8 +51,10 @@ class Vertex(QGraphicsEllipseItem):
             self.highlightColor = colors[colorIndex]
 
     def update(self):
-        self.setToolTip(f"Degree: {str(len(self.edges))}")
-        self.addLabel()
+        # The label is persistent, only the degree tooltip changes
+        graph = self.scene()
+        if graph is not None and hasattr(graph, "getDegree"):
+            self.setToolTip(f"Degree: {str(graph.getDegree(self))}")
         super().update()
 
     def paint(self, painter, option, widget=None):